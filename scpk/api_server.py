@@ -0,0 +1,406 @@
+import argparse
+import asyncio
+import gzip
+import json
+import multiprocessing
+import os
+import traceback
+from concurrent.futures import ThreadPoolExecutor
+from http import HTTPStatus
+from urllib.parse import parse_qsl, urlsplit
+
+from availability_feed import start_feed_from_env
+from cards import PAGE_SIZE
+from food_data import default_weights, load_food_catalogue
+from instrumentation import (STARTUP_TARGET_SECONDS, TRACK_ALLOCATIONS, mark_startup, metrics, prometheus_text,
+                             stage, startup_marks, startup_stats, trace)
+from ranking import SORT_KEYS
+from recommender import (PRICE_RANGES, RATING_OPTIONS, SEARCH_MODES, SORT_ALIASES,
+                         filter_options, normalize_weights, pruning_snapshot, query_flight, recommend)
+from result_cache import filter_cache
+from sensitivity import DEFAULT_K, weight_sensitivity
+from sharded_catalogue import PARTITION_MODES, ShardedCatalogue
+from single_flight import AsyncSingleFlight
+from wp_engine import CRITERIA
+
+# Ukuran worker pool untuk filter/score/serialisasi; request yang menunggu di atas
+# PENDING_PER_WORKER per worker langsung ditolak (503)
+WORKERS = int(os.environ.get("MOODRASA_API_WORKERS", min(32, (os.cpu_count() or 1) * 4)))
+PENDING_PER_WORKER = 64
+
+# Koneksi keep-alive ditutup setelah idle selama ini
+KEEP_ALIVE_SECONDS = 15
+
+# Content type of the Prometheus text exposition format (/metrics)
+PROMETHEUS_CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+# Response lebih kecil dari ini tidak dikompresi
+GZIP_MIN_BYTES = 1024
+GZIP_LEVEL = 5
+
+MAX_BODY_BYTES = 64 * 1024
+MAX_PAGE_SIZE = 100
+
+# Function to turn API parameters (query string or JSON body) into filter_catalogue arguments
+# Nama parameter mengikuti sidebar: category, location, meal_time, budget atau price_min/price_max,
+# rating atau min_rating, search, search_mode, sort_by, weights (atau w_<Kriteria>), max_error, shortlist,
+# page, page_size
+def parse_params(params):
+    filters = {}
+    for name in ("category", "location", "meal_time"):
+        if name in params:
+            filters[name] = str(params[name])
+
+    if "budget" in params:
+        if params["budget"] not in PRICE_RANGES:
+            raise ValueError(f"Unknown budget: {params['budget']}")
+        filters["price_range"] = PRICE_RANGES[params["budget"]]
+    if "price_min" in params or "price_max" in params:
+        low, high = filters.get("price_range", PRICE_RANGES["All Budgets"])
+        filters["price_range"] = (float(params.get("price_min", low)), float(params.get("price_max", high)))
+
+    if "rating" in params:
+        if params["rating"] not in RATING_OPTIONS:
+            raise ValueError(f"Unknown rating option: {params['rating']}")
+        filters["min_rating"] = RATING_OPTIONS[params["rating"]]
+    if "min_rating" in params:
+        filters["min_rating"] = float(params["min_rating"])
+
+    if "search" in params:
+        filters["search_text"] = str(params["search"])
+    if "search_mode" in params:
+        if params["search_mode"] not in SEARCH_MODES:
+            raise ValueError(f"Unknown search mode: {params['search_mode']}")
+        filters["search_mode"] = params["search_mode"]
+
+    if "sort_by" in params:
+        sort_by = SORT_ALIASES.get(params["sort_by"], params["sort_by"])
+        if sort_by not in SORT_KEYS:
+            raise ValueError(f"Unknown sort option: {params['sort_by']}")
+        filters["sort_by"] = sort_by
+
+    # Bobot mentah seperti slider (0-1), dinormalisasi menjadi total 1
+    weights = dict(params.get("weights") or {})
+    weights.update({name[2:]: value for name, value in params.items() if name.startswith("w_")})
+    if weights:
+        unknown = set(weights) - set(CRITERIA)
+        if unknown:
+            raise ValueError(f"Unknown weight criteria: {sorted(unknown)}")
+        raw = {c: float(weights.get(c, default_weights[c])) for c in CRITERIA}
+        if any(value < 0 for value in raw.values()):
+            raise ValueError("Weights must not be negative")
+        filters["custom_weights"] = normalize_weights(raw)
+
+    # Top-K WP yang mendekati: skor yang terlewat paling banyak (1 + max_error) x skor terendah
+    if "max_error" in params:
+        max_error = float(params["max_error"])
+        if not 0 <= max_error <= 1:
+            raise ValueError("max_error must be between 0 and 1")
+        filters["max_error"] = max_error
+
+    # TOPSIS hanya untuk N kandidat terbaik menurut SAW (pendekatan; tanpa parameter ini semua baris dinilai)
+    if "shortlist" in params:
+        shortlist = int(params["shortlist"])
+        if shortlist < 1:
+            raise ValueError("shortlist must be >= 1")
+        filters["shortlist"] = shortlist
+
+    page = int(params.get("page", 1))
+    page_size = int(params.get("page_size", PAGE_SIZE))
+    if page < 1 or not 1 <= page_size <= MAX_PAGE_SIZE:
+        raise ValueError(f"page must be >= 1 and page_size between 1 and {MAX_PAGE_SIZE}")
+    return page, page_size, filters
+
+# Function to run the weight-sensitivity analysis of the WP top-k for /sensitivity
+# Filter, bobot dan sort_by sama dengan /recommendations, ditambah k (jumlah hidangan teratas). Sort yang
+# tidak diurutkan menurut WP dianalisis sebagai Best WP Score; max_error dan shortlist diabaikan.
+# Interval dalam satuan bobot yang dinormalisasi
+def sensitivity_payload(catalogue, params, filters):
+    k = int(params.get("k", DEFAULT_K))
+    if not 1 <= k <= MAX_PAGE_SIZE:
+        raise ValueError(f"k must be between 1 and {MAX_PAGE_SIZE}")
+    weights = filters.pop("custom_weights", None)
+    for name in ("max_error", "shortlist"):
+        filters.pop(name, None)
+    return {"version": catalogue.version, "k": k, **weight_sensitivity(catalogue, weights, k, **filters)}
+
+# Async HTTP/1.1 JSON server for recommendations, without Streamlit
+# Koneksi dilayani oleh event loop (keep-alive, banyak koneksi sekaligus), sedangkan
+# pekerjaan CPU (filter, skor, JSON, gzip) dijalankan di ThreadPoolExecutor yang dibatasi
+class RecommendationServer:
+    def __init__(self, current=load_food_catalogue, workers=WORKERS, max_pending=None, sharded=None):
+        # current() mengembalikan catalogue terbaru (mengikuti reload file dan availability feed)
+        # Dengan sharded (ShardedCatalogue), query dijawab oleh proses shard lewat scatter-gather
+        self.sharded = sharded
+        self.current = current if sharded is None else (lambda: sharded)
+        self.pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="api")
+        self.max_pending = max_pending or workers * PENDING_PER_WORKER
+        self.pending = 0
+
+        # Request identik yang datang bersamaan berbagi satu response yang sudah di-encode
+        self.flight = AsyncSingleFlight()
+
+        self.requests = 0
+        self.rejected = 0
+
+        # Catalogue terakhir yang dimuat di worker pool; event loop hanya membaca ini (lihat _catalogue)
+        self._latest = None
+        self._refresh = None
+
+    # Function to get the catalogue for a request without blocking the event loop
+    # current() memuat ulang dan membangun catalogue secara sinkron bila file berubah, jadi dijalankan
+    # di worker pool (paling banyak satu sekaligus). Sampai selesai, request dilayani dengan versi sebelumnya
+    async def _catalogue(self):
+        if self._refresh is None or self._refresh.done():
+            self._refresh = asyncio.get_running_loop().run_in_executor(self.pool, self._load_current)
+        if self._latest is None:
+            await asyncio.shield(self._refresh)
+        return self._latest
+
+    # Function to load the current catalogue (dijalankan di worker thread)
+    # Bila reload gagal, versi sebelumnya tetap dipakai
+    def _load_current(self):
+        try:
+            self._latest = self.current()
+        except Exception:
+            if self._latest is None:
+                raise
+            traceback.print_exc()
+
+    # Function to start listening; returns the asyncio server
+    # reuse_port: beberapa proses boleh mendengarkan port yang sama (kernel membagi koneksi)
+    async def start(self, host="127.0.0.1", port=8000, reuse_port=False):
+        return await asyncio.start_server(self._serve_connection, host, port, reuse_port=reuse_port or None)
+
+    # Function to serve one client connection (beberapa request berurutan bila keep-alive)
+    async def _serve_connection(self, reader, writer):
+        try:
+            while True:
+                try:
+                    request_line = await asyncio.wait_for(reader.readline(), KEEP_ALIVE_SECONDS)
+                except asyncio.TimeoutError:
+                    break
+                if not request_line.strip():
+                    break
+
+                try:
+                    method, target, version = request_line.decode("latin-1").split()
+                except ValueError:
+                    await self._write(writer, HTTPStatus.BAD_REQUEST, {"error": "Malformed request line"}, False, False)
+                    break
+
+                headers = {}
+                while True:
+                    line = await reader.readline()
+                    if line in (b"\r\n", b"\n", b""):
+                        break
+                    name, _, value = line.decode("latin-1").partition(":")
+                    headers[name.strip().lower()] = value.strip()
+
+                connection = headers.get("connection", "").lower()
+                keep_alive = connection != "close" if version == "HTTP/1.1" else connection == "keep-alive"
+                accept_gzip = "gzip" in headers.get("accept-encoding", "")
+
+                length = headers.get("content-length", "0")
+                if not length.isdigit() or int(length) > MAX_BODY_BYTES:
+                    await self._write(writer, HTTPStatus.REQUEST_ENTITY_TOO_LARGE, {"error": "Invalid or too large body"}, False, False)
+                    break
+                length = int(length)
+                body = await reader.readexactly(length) if length else b""
+
+                status, response, extra_headers = await self._dispatch(method, target, body, accept_gzip)
+                await self._write(writer, status, response, keep_alive, accept_gzip, extra_headers)
+                if not keep_alive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+    # Function to route one request; CPU work runs in the bounded worker pool
+    async def _dispatch(self, method, target, body, accept_gzip):
+        self.requests += 1
+        url = urlsplit(target)
+
+        if url.path == "/health":
+            catalogue = await self._catalogue()
+            rows = catalogue.rows if self.sharded else len(catalogue.data)
+            return HTTPStatus.OK, {"status": "ok", "version": catalogue.version, "rows": rows}, {}
+        if url.path == "/stats":
+            return HTTPStatus.OK, self.stats(), {}
+        if url.path == "/metrics":
+            # Timing per stage (histogram) ditambah counter dari /stats, dalam format teks Prometheus
+            gauges = {name: value for name, value in self.stats().items() if name != "instrumentation"}
+            body = prometheus_text(gauges).encode("utf-8")
+            return HTTPStatus.OK, (body, None), {"Content-Type": PROMETHEUS_CONTENT_TYPE}
+        if url.path not in ("/recommendations", "/options", "/sensitivity"):
+            return HTTPStatus.NOT_FOUND, {"error": f"Unknown path: {url.path}"}, {}
+        if method not in ("GET", "POST") or (url.path == "/options" and method != "GET"):
+            return HTTPStatus.METHOD_NOT_ALLOWED, {"error": f"Method {method} not allowed"}, {"Allow": "GET, POST"}
+
+        # Backpressure: tolak cepat daripada membiarkan antrean tumbuh tanpa batas
+        if self.pending >= self.max_pending:
+            self.rejected += 1
+            return HTTPStatus.SERVICE_UNAVAILABLE, {"error": "Server busy"}, {"Retry-After": "1"}
+
+        self.pending += 1
+        try:
+            loop = asyncio.get_running_loop()
+            # Hanya leader yang memakai worker pool; follower menunggu response yang sama.
+            # Versi catalogue ikut di key, dan response dihitung dengan catalogue yang sama
+            catalogue = await self._catalogue()
+            key = (catalogue.version, method, url.path, url.query, body, accept_gzip)
+            return await self.flight.do(
+                key, lambda: loop.run_in_executor(self.pool, self._handle, catalogue, method, url, body, accept_gzip)
+            )
+        except Exception:
+            traceback.print_exc()
+            return HTTPStatus.INTERNAL_SERVER_ERROR, {"error": "Internal server error"}, {}
+        finally:
+            self.pending -= 1
+
+    # Function to handle /recommendations, /options and /sensitivity (dijalankan di worker thread)
+    # Body dikembalikan sudah dalam bentuk bytes (JSON, dan gzip bila diminta)
+    def _handle(self, catalogue, method, url, body, accept_gzip):
+        with trace("request", method=method, path=url.path, query=url.query) as timing:
+            response = self._respond(catalogue, method, url, body, accept_gzip)
+            timing.annotate(status=response[0].value)
+        return response
+
+    # Function to build the response of one request (lihat _handle)
+    def _respond(self, catalogue, method, url, body, accept_gzip):
+        try:
+            if url.path == "/options":
+                payload = catalogue.filter_options() if self.sharded else filter_options(catalogue)
+            else:
+                params = dict(parse_qsl(url.query))
+                if method == "POST" and body:
+                    params.update(json.loads(body))
+                page, page_size, filters = parse_params(params)
+                if url.path == "/sensitivity":
+                    if self.sharded:
+                        return HTTPStatus.NOT_IMPLEMENTED, {"error": "Sensitivity analysis is not available with shards"}, {}
+                    payload = sensitivity_payload(catalogue, params, filters)
+                elif self.sharded:
+                    payload = catalogue.recommend(page, page_size, **filters)
+                else:
+                    payload = recommend(catalogue, page, page_size, **filters)
+        except (ValueError, TypeError) as error:
+            return HTTPStatus.BAD_REQUEST, {"error": str(error)}, {}
+        with stage("encode"):
+            response = _encode(payload, accept_gzip)
+        return HTTPStatus.OK, response, {}
+
+    # Function to get the server counters: request coalescing (HTTP dan query), result cache,
+    # pruning dan timing per stage (bila MOODRASA_INSTRUMENT aktif)
+    def stats(self):
+        return {
+            "requests": self.requests,
+            "rejected": self.rejected,
+            "pending": self.pending,
+            "request_coalescing": self.flight.stats(),
+            "query_coalescing": query_flight.stats(),
+            "filter_cache": filter_cache.stats(),
+            "pruning": pruning_snapshot(),
+            "instrumentation": metrics.stats(),
+            "startup": startup_stats(),
+        }
+
+    # Function to write one response
+    async def _write(self, writer, status, response, keep_alive, accept_gzip, extra_headers=None):
+        if not isinstance(response, tuple):
+            response = _encode(response, accept_gzip)
+        body, encoding = response
+
+        headers = {
+            "Content-Type": "application/json; charset=utf-8",
+            "Content-Length": str(len(body)),
+            "Connection": "keep-alive" if keep_alive else "close",
+            "Vary": "Accept-Encoding",
+        }
+        if encoding:
+            headers["Content-Encoding"] = encoding
+        headers.update(extra_headers or {})
+
+        head = f"HTTP/1.1 {status.value} {status.phrase}\r\n" + "".join(f"{k}: {v}\r\n" for k, v in headers.items()) + "\r\n"
+        writer.write(head.encode("latin-1") + body)
+        await writer.drain()
+
+        # Time-to-first-response sejak proses dimulai (metrik cold start, lihat MOODRASA_STARTUP_TARGET)
+        if "first_response" not in startup_marks:
+            seconds = mark_startup("first_response")
+            status_mark = "✅" if seconds <= STARTUP_TARGET_SECONDS else "⚠️"
+            print(f"{status_mark} First response {seconds:.2f} s after process start (target {STARTUP_TARGET_SECONDS:.1f} s)")
+
+    # Function to release the worker pool
+    def close(self):
+        self.pool.shutdown(wait=False)
+        if self.sharded:
+            self.sharded.close()
+
+# Function to run serve() in one process (target untuk proses tambahan)
+def _serve_process(host, port, workers, reuse_port, shards=0, shard_by="Lokasi"):
+    try:
+        asyncio.run(serve(host, port, workers, reuse_port, shards, shard_by))
+    except KeyboardInterrupt:
+        pass
+
+# Function to serialize a payload as JSON, gzip-compressed when the client accepts it
+# and the body is large enough to be worth it; returns (body, content encoding)
+def _encode(payload, accept_gzip):
+    body = json.dumps(payload, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+    if accept_gzip and len(body) >= GZIP_MIN_BYTES:
+        return gzip.compress(body, compresslevel=GZIP_LEVEL), "gzip"
+    return body, None
+
+# Function to run the API until interrupted
+async def serve(host, port, workers, reuse_port=False, shards=0, shard_by="Lokasi"):
+    # Peak alokasi per stage tidak bisa diatribusikan dengan benar saat worker thread berjalan bersamaan
+    if TRACK_ALLOCATIONS:
+        raise SystemExit("⚠️ MOODRASA_INSTRUMENT=alloc only works single-threaded; "
+                         "use MOODRASA_INSTRUMENT=1 with the API server")
+    # Catalogue dimuat sebelum menerima koneksi, agar request pertama tidak menanggung cold start
+    # Index pencarian tidak ikut dimuat di sini: dibangun di background setelah server mendengarkan
+    if shards:
+        api = RecommendationServer(workers=workers, sharded=ShardedCatalogue(shards, shard_by))
+    else:
+        load_food_catalogue()
+        start_feed_from_env(load_food_catalogue)
+        api = RecommendationServer(load_food_catalogue, workers)
+    mark_startup("catalogue_loaded")
+
+    server = await api.start(host, port, reuse_port)
+    mark_startup("listening")
+    if not shards:
+        load_food_catalogue().warm_up()
+    mode = f", {shards} shards by {shard_by}" if shards else ""
+    print(f"✅ Mood Rasa API listening on http://{host}:{port} ({workers} workers{mode}, pid {os.getpid()}, "
+          f"listening {startup_marks['listening']:.2f} s after process start)")
+    try:
+        async with server:
+            await server.serve_forever()
+    finally:
+        api.close()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Serve Mood Rasa recommendations as a JSON API")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--workers", type=int, default=WORKERS, help="worker threads for filtering and scoring")
+    parser.add_argument("--processes", type=int, default=1,
+                        help="server processes sharing the port (0 = all cores); scoring is CPU bound, so scale with processes")
+    parser.add_argument("--shards", type=int, default=0, help="partition the catalogue across this many shard processes")
+    parser.add_argument("--shard-by", choices=PARTITION_MODES, default="Lokasi", help="how rows are assigned to shards")
+    args = parser.parse_args()
+
+    # Setiap proses memuat catalogue sendiri; dengan catalogue store (mmap) halaman datanya dibagi OS.
+    # Proses tambahan bukan daemon, karena dengan --shards mereka sendiri membuat proses shard
+    processes = args.processes or os.cpu_count()
+    reuse_port = processes > 1
+    serve_args = (args.host, args.port, args.workers, reuse_port, args.shards, args.shard_by)
+    children = [multiprocessing.Process(target=_serve_process, args=serve_args) for _ in range(processes - 1)]
+    for child in children:
+        child.start()
+    _serve_process(*serve_args)
+    for child in children:
+        child.terminate()
@@ -0,0 +1,254 @@
+import json
+import os
+import queue
+import socketserver
+import threading
+import time
+
+import numpy as np
+
+from catalogue import publish_catalogue
+from catalogue_updates import CatalogueEditor
+from wp_engine import CRITERIA, build_criteria_matrix
+
+# Kolom yang diperbarui oleh feed
+FEED_COLUMN = 'Ketersediaan'
+
+# Micro-batch: diterapkan saat BATCH_SIZE update terkumpul atau BATCH_SECONDS berlalu
+BATCH_SIZE = 1000
+BATCH_SECONDS = 0.5
+
+# Sumber feed untuk aplikasi, misalnya "file:availability.jsonl" atau "tcp:127.0.0.1:9100"
+FEED_SOURCE = os.environ.get("MOODRASA_AVAILABILITY_FEED")
+
+# Function to parse one update line: JSON {"id": 12, "Ketersediaan": 80} or CSV "12,80"
+# id adalah posisi baris di catalogue. Baris yang tidak valid menghasilkan None
+def parse_update(line):
+    line = line.strip()
+    if not line:
+        return None
+    try:
+        if line.startswith("{"):
+            message = json.loads(line)
+            row_id, value = message["id"], message[FEED_COLUMN]
+        else:
+            row_id, value = line.split(",")
+        row_id, value = int(row_id), float(value)
+    except (ValueError, KeyError, TypeError):
+        return None
+    if not 0 <= value <= 100:
+        return None
+    return row_id, value
+
+# Handler for the TCP feed: one update per line
+class _FeedHandler(socketserver.StreamRequestHandler):
+    def handle(self):
+        for line in self.rfile:
+            self.server.feed.put_line(line.decode("utf-8", errors="replace"))
+
+class _FeedServer(socketserver.ThreadingTCPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+
+# Availability feed: collects updates from a file, socket or in-process queue and applies them
+# in micro-batches to the shared catalogue.
+# Setiap batch diterapkan pada CatalogueEditor (hanya baris yang berubah diberi skor ulang,
+# kecuali batas normalisasi bergeser), lalu versi catalogue baru yang immutable dipublikasikan
+# dengan publish_catalogue. Pembaca di apply_filters tidak pernah menunggu dan tidak pernah
+# melihat batch yang setengah diterapkan: mereka memegang versi lama sampai rerun berikutnya.
+class AvailabilityFeed:
+    def __init__(self, current, batch_size=BATCH_SIZE, batch_seconds=BATCH_SECONDS):
+        # current() mengembalikan catalogue yang sedang dipakai (misalnya load_food_catalogue)
+        self.current = current
+        self.batch_size = batch_size
+        self.batch_seconds = batch_seconds
+        self.updates = queue.Queue()
+
+        self._editor = None
+        self._base = None
+        self._stop = threading.Event()
+        self._threads = []
+        self._servers = []
+
+        self.batches = 0
+        self.applied = 0
+        self.unchanged = 0
+        self.rejected = 0
+        self.last_publish_seconds = 0.0
+
+    # Function to queue one update (stand-in for a message queue consumer)
+    def put(self, row_id, value):
+        self.updates.put((int(row_id), float(value)))
+
+    # Function to parse and queue one raw update line
+    def put_line(self, line):
+        update = parse_update(line)
+        if update is None:
+            if line.strip():
+                self.rejected += 1
+            return
+        self.updates.put(update)
+
+    # Function to start the micro-batch worker thread
+    def start(self):
+        self._spawn(self._run)
+        return self
+
+    # Function to stop all feed threads and servers
+    def stop(self):
+        self._stop.set()
+        for server in self._servers:
+            server.shutdown()
+            server.server_close()
+        for thread in self._threads:
+            thread.join(timeout=5)
+
+    # Function to follow a file of update lines: dibaca dari awal, lalu diikuti saat bertambah (seperti tail -f)
+    def follow_file(self, path, poll_seconds=0.2):
+        def follow():
+            while not os.path.exists(path) and not self._stop.wait(poll_seconds):
+                pass
+            with open(path, encoding="utf-8") as f:
+                pending = ""
+                while not self._stop.is_set():
+                    chunk = f.readline()
+                    if not chunk:
+                        self._stop.wait(poll_seconds)
+                        continue
+                    pending += chunk
+                    # Baris yang belum selesai ditulis ditunggu sampai ada newline
+                    if pending.endswith("\n"):
+                        self.put_line(pending)
+                        pending = ""
+        self._spawn(follow)
+        return self
+
+    # Function to accept update lines over TCP; returns the bound (host, port)
+    def listen(self, host="127.0.0.1", port=0):
+        server = _FeedServer((host, port), _FeedHandler)
+        server.feed = self
+        self._servers.append(server)
+        self._spawn(server.serve_forever)
+        return server.server_address
+
+    # Function to start a daemon thread owned by the feed
+    def _spawn(self, target):
+        thread = threading.Thread(target=target, daemon=True)
+        thread.start()
+        self._threads.append(thread)
+
+    # Function to micro-batch queued updates until stopped
+    def _run(self):
+        while not self._stop.is_set():
+            batch = self._next_batch()
+            if batch:
+                self.apply(batch)
+
+    # Function to collect one micro-batch {row_id: value}; update terakhir per baris yang dipakai
+    def _next_batch(self):
+        try:
+            row_id, value = self.updates.get(timeout=self.batch_seconds)
+        except queue.Empty:
+            return {}
+        batch = {row_id: value}
+        deadline = time.monotonic() + self.batch_seconds
+        while len(batch) < self.batch_size:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                row_id, value = self.updates.get(timeout=remaining)
+            except queue.Empty:
+                break
+            batch[row_id] = value
+        return batch
+
+    # Function to apply one micro-batch and publish the resulting catalogue version
+    def apply(self, batch):
+        start = time.perf_counter()
+        for _ in range(2):
+            catalogue = self.current()
+            if self._base is not catalogue:
+                # Catalogue baru (dimuat ulang dari file atau dipublikasikan pihak lain): mulai ulang editor
+                self._editor = CatalogueEditor(catalogue.data[CRITERIA + ['WP_Score']].astype(np.float64))
+                self._base = catalogue
+
+            ids = np.fromiter(batch, dtype=np.int64, count=len(batch))
+            values = np.fromiter(batch.values(), dtype=np.float64, count=len(batch))
+            known = (ids >= 0) & (ids < len(catalogue.data))
+            ids, values = ids[known], values[known]
+            if len(ids) == 0:
+                self.rejected += len(batch)
+                return None
+
+            editor = self._editor
+            # Nilai yang sama dengan nilai sekarang tidak diterapkan: skor dan versi catalogue tetap
+            changed = editor.data[FEED_COLUMN].to_numpy()[ids] != values
+            if not changed.any():
+                self.unchanged += len(ids)
+                self.rejected += int((~known).sum())
+                return None
+            unchanged = int((~changed).sum())
+            ids, values = ids[changed], values[changed]
+
+            full_rescores = editor.full_rescores
+            editor.update(ids, {FEED_COLUMN: values})
+
+            # Matriks kriteria: dibangun ulang bila batas bergeser, selain itu hanya baris yang berubah
+            if editor.full_rescores != full_rescores:
+                wp_matrix = build_criteria_matrix(editor.data, editor.stats())
+            else:
+                wp_matrix = catalogue.wp_matrix.copy()
+                wp_matrix[ids] = build_criteria_matrix(editor.data.loc[ids, CRITERIA], editor.stats())
+            wp_matrix.flags.writeable = False
+
+            published = catalogue.with_columns(
+                {FEED_COLUMN: editor.data[FEED_COLUMN].to_numpy(), 'WP_Score': editor.data['WP_Score'].to_numpy()},
+                wp_matrix,
+            )
+            if publish_catalogue(published, catalogue):
+                self._base = published
+                self.batches += 1
+                self.applied += len(ids)
+                self.unchanged += unchanged
+                self.rejected += int((~known).sum())
+                self.last_publish_seconds = time.perf_counter() - start
+                return published
+
+            # Catalogue berganti selagi batch diterapkan: ulangi sekali di atas versi terbaru
+            self._base = None
+        return None
+
+    # Function to get the feed counters
+    def stats(self):
+        return {
+            'batches': self.batches,
+            'applied': self.applied,
+            'unchanged': self.unchanged,
+            'rejected': self.rejected,
+            'pending': self.updates.qsize(),
+            'last_publish_seconds': self.last_publish_seconds,
+        }
+
+# Process-wide feed started from MOODRASA_AVAILABILITY_FEED (satu per proses Streamlit)
+_feed = None
+_feed_lock = threading.Lock()
+
+# Function to start the configured feed once per process; returns it (or None if not configured)
+def start_feed_from_env(current, source=FEED_SOURCE):
+    global _feed
+    if not source or _feed is not None:
+        return _feed
+    with _feed_lock:
+        if _feed is None:
+            feed = AvailabilityFeed(current)
+            kind, _, target = source.partition(":")
+            if kind == "file":
+                feed.follow_file(target)
+            elif kind == "tcp":
+                host, _, port = target.rpartition(":")
+                feed.listen(host or "127.0.0.1", int(port))
+            else:
+                raise ValueError(f"Unknown availability feed source: {source}")
+            _feed = feed.start()
+        return _feed
@@ -0,0 +1,278 @@
+import argparse
+import gc
+import http.client
+import json
+import os
+import platform
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+
+import numpy as np
+import pandas as pd
+
+from cards import PAGE_SIZE, render_food_cards
+from catalogue import Catalogue, take_rows
+from food_data import calculate_wp_score, default_weights, load_food_data
+from ranking import SORT_KEYS
+from recommender import PRICE_RANGES, filter_catalogue
+from result_cache import filter_cache
+from search_index import SearchIndex
+from synthetic_data import default_profile, write_csv
+
+# Ukuran catalogue default (jumlah baris) dan seed data sintetis
+SIZES = [1_000, 10_000, 100_000]
+SEED = 42
+
+# Setiap case diulang sampai MIN_SECONDS tercapai (minimal MIN_REPEATS, maksimal MAX_REPEATS kali)
+MIN_REPEATS = 5
+MAX_REPEATS = 200
+MIN_SECONDS = 1.0
+
+# Kenaikan p50 atau peak memory di atas ambang ini (relatif terhadap baseline) dianggap regresi,
+# asalkan selisih absolutnya juga di atas batas derau (MIN_CHANGE)
+REGRESSION_THRESHOLD = 0.20
+MIN_CHANGE = {"p50_ms": 0.2, "peak_memory_bytes": 256 * 1024}
+
+# Cold start diukur di proses baru, beberapa kali; server API ditunggu paling lama sekian detik
+STARTUP_REPEATS = 3
+STARTUP_TIMEOUT = 60
+
+# Bobot custom untuk case yang menilai ulang dari matriks kriteria
+CUSTOM_WEIGHTS = {'Rating': 0.1, 'Harga': 0.5, 'Waktu_Persiapan': 0.1, 'Popularitas': 0.2, 'Ketersediaan': 0.1}
+
+# Function to list the apply_filters cases: (nama, argumen filter_catalogue)
+# Satu case per filter, per mode pencarian, per sort option, plus bobot custom dan semua filter sekaligus
+def filter_cases():
+    cases = [
+        ("filter:none", {}),
+        ("filter:category", {"category": "Manis"}),
+        ("filter:location", {"location": "Jawa Barat"}),
+        ("filter:meal_time", {"meal_time": "Makan Siang"}),
+        ("filter:price_range", {"price_range": PRICE_RANGES["Mid Range (25k - 40k)"]}),
+        ("filter:min_rating", {"min_rating": 4.5}),
+        ("search:substring", {"search_text": "ayam"}),
+        ("search:prefix", {"search_text": "nasi gor", "search_mode": "prefix"}),
+        ("search:fuzzy", {"search_text": "rendagn", "search_mode": "fuzzy"}),
+        ("weights:custom", {"custom_weights": CUSTOM_WEIGHTS}),
+        ("filter:combined", {"category": "Pedas", "meal_time": "Makan Siang", "price_range": PRICE_RANGES["Budget Friendly (< 25k)"],
+                             "min_rating": 4.0, "search_text": "ayam"}),
+    ]
+    cases += [(f"sort:{sort_by}", {"sort_by": sort_by}) for sort_by in SORT_KEYS]
+    return cases
+
+# Function to time function() repeatedly; returns the latencies in seconds
+# setup() dijalankan sebelum setiap ulangan dan tidak ikut diukur (misalnya mengosongkan cache)
+def measure(function, setup=None, min_repeats=MIN_REPEATS, max_repeats=MAX_REPEATS, min_seconds=MIN_SECONDS):
+    latencies = []
+    started = time.perf_counter()
+    while len(latencies) < max_repeats and (len(latencies) < min_repeats or time.perf_counter() - started < min_seconds):
+        if setup is not None:
+            setup()
+        start = time.perf_counter()
+        function()
+        latencies.append(time.perf_counter() - start)
+    return latencies
+
+# Function to measure the peak Python/numpy allocation of one call (tracemalloc, dijalankan terpisah
+# dari pengukuran waktu karena tracemalloc memperlambat eksekusi)
+def peak_memory(function, setup=None):
+    if setup is not None:
+        setup()
+    gc.collect()
+    tracemalloc.start()
+    try:
+        function()
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+# Function to summarize one case: throughput, p50/p99 latency and peak memory
+# rows = jumlah baris yang diproses per panggilan (untuk throughput baris/detik)
+def summarize(latencies, peak_bytes, rows):
+    latencies = np.asarray(latencies)
+    mean = float(latencies.mean())
+    return {
+        "repeats": len(latencies),
+        "mean_ms": mean * 1e3,
+        "p50_ms": float(np.percentile(latencies, 50)) * 1e3,
+        "p99_ms": float(np.percentile(latencies, 99)) * 1e3,
+        "ops_per_second": 1 / mean if mean else None,
+        "rows_per_second": rows / mean if mean else None,
+        "peak_memory_bytes": int(peak_bytes),
+    }
+
+# Function to run one benchmark case and print its line
+def run_case(results, name, function, rows, setup=None, **repeats):
+    latencies = measure(function, setup, **repeats)
+    results[name] = summarize(latencies, peak_memory(function, setup), rows)
+    print_case(name, results[name])
+
+# Function to print the summary line of one case
+def print_case(name, result):
+    print(f"  {name:<28} p50 {result['p50_ms']:9.3f} ms   p99 {result['p99_ms']:9.3f} ms   "
+          f"{result['rows_per_second']:14,.0f} rows/s   peak {result['peak_memory_bytes'] / 2**20:8.1f} MiB")
+
+# Function to benchmark every hot path at one catalogue size
+def benchmark_size(rows, folder, seed=SEED, profile=None):
+    csv_path = os.path.join(folder, f"bench_{rows}_{seed}.csv")
+    if not os.path.exists(csv_path):
+        write_csv(csv_path, rows, seed, profile)
+    print(f"📏 {rows:,} rows")
+
+    results = {}
+    run_case(results, "csv_load", lambda: load_food_data(csv_path), rows, max_repeats=20)
+    data = load_food_data(csv_path)
+    raw = data.drop(columns="WP_Score")
+    run_case(results, "calculate_wp_score", lambda: calculate_wp_score(raw, default_weights), rows)
+
+    run_case(results, "catalogue_build", lambda: Catalogue(data, ("bench", rows)), rows, min_repeats=1, max_repeats=3, min_seconds=0)
+    catalogue = Catalogue(data, ("bench", rows))
+
+    # Search index dibangun lazy saat pencarian pertama; build-nya diukur sendiri lalu index dipanaskan,
+    # agar case search tidak ikut mengukur build
+    run_case(results, "search_index_build", lambda: SearchIndex(catalogue.data), rows, min_repeats=1, max_repeats=3, min_seconds=0)
+    search_index = catalogue.search_index()
+
+    # apply_filters: setiap ulangan diukur tanpa cache (cache miss, seperti kombinasi filter baru),
+    # termasuk memo query terakhir di search index
+    def cold():
+        filter_cache.clear()
+        search_index.clear()
+
+    for name, filters in filter_cases():
+        run_case(results, name, lambda: filter_catalogue(catalogue, top_k=PAGE_SIZE, **filters), rows, setup=cold)
+    run_case(results, "filter:cached", lambda: filter_catalogue(catalogue, top_k=PAGE_SIZE), rows)
+
+    # Card HTML untuk satu halaman hasil (baris yang ditampilkan + render)
+    positions, scores = filter_catalogue(catalogue, top_k=PAGE_SIZE)
+    run_case(results, "cards:page", lambda: render_food_cards(
+        take_rows(catalogue.data, positions[:PAGE_SIZE], scores[:PAGE_SIZE])), PAGE_SIZE)
+    return results
+
+# Function to get a free local TCP port for a throwaway server
+def _free_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+# Function to time one cold start of the API: seconds from spawning the process to the first /health response
+def api_first_response(folder, timeout=STARTUP_TIMEOUT):
+    port = _free_port()
+    start = time.perf_counter()
+    server = subprocess.Popen([sys.executable, "api_server.py", "--port", str(port)], cwd=folder,
+                              stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    try:
+        while time.perf_counter() - start < timeout:
+            if server.poll() is not None:
+                raise RuntimeError(f"api_server exited with code {server.returncode}")
+            try:
+                connection = http.client.HTTPConnection("127.0.0.1", port, timeout=1)
+                connection.request("GET", "/health")
+                if connection.getresponse().status == 200:
+                    return time.perf_counter() - start
+            except OSError:
+                time.sleep(0.01)
+        raise RuntimeError("api_server did not respond in time")
+    finally:
+        server.terminate()
+        server.wait()
+
+# Function to benchmark cold start: importing the data/scoring core (tanpa Streamlit) and the
+# API's time-to-first-response, each in a fresh process
+def benchmark_startup(repeats=STARTUP_REPEATS):
+    folder = os.path.dirname(os.path.abspath(__file__))
+    print("🚀 startup")
+    core = "import sys, recommender, api_server; assert 'streamlit' not in sys.modules"
+    import_core = lambda: subprocess.run([sys.executable, "-c", core], cwd=folder, check=True)
+
+    # Memori puncak tidak diukur: pekerjaannya terjadi di proses lain
+    results = {
+        "startup:import_core": summarize(measure(import_core, None, repeats, repeats, 0), 0, 1),
+        "startup:api_first_response": summarize([api_first_response(folder) for _ in range(repeats)], 0, 1),
+    }
+    for name, result in results.items():
+        print_case(name, result)
+    return results
+
+# Function to describe the environment the numbers were measured in
+def environment():
+    try:
+        commit = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                                cwd=os.path.dirname(os.path.abspath(__file__))).stdout.strip() or None
+    except OSError:
+        commit = None
+    return {
+        "commit": commit,
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "python": sys.version.split()[0],
+        "numpy": np.__version__,
+        "pandas": pd.__version__,
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+    }
+
+# Function to run the whole suite: {"environment": ..., "seed": ..., "results": {rows: {case: summary}}}
+def run_benchmarks(sizes=SIZES, seed=SEED, folder=None, startup=True):
+    profile = default_profile()
+    report = {"environment": environment(), "seed": seed, "results": {}}
+    if startup:
+        report["results"]["startup"] = benchmark_startup()
+    with tempfile.TemporaryDirectory(prefix="moodrasa-bench-") as temp_folder:
+        for rows in sizes:
+            report["results"][str(rows)] = benchmark_size(rows, folder or temp_folder, seed, profile)
+    return report
+
+# Function to compare a report with a baseline; returns the regressions found
+# Hanya p50 dan peak memory yang dibandingkan (p99 terlalu berisik untuk ambang tetap)
+def compare(report, baseline, threshold=REGRESSION_THRESHOLD):
+    regressions = []
+    for rows, cases in report["results"].items():
+        for name, result in cases.items():
+            before = baseline.get("results", {}).get(rows, {}).get(name)
+            if before is None:
+                continue
+            for metric, min_change in MIN_CHANGE.items():
+                if before[metric] and result[metric] > before[metric] * (1 + threshold) \
+                        and result[metric] - before[metric] > min_change:
+                    regressions.append({
+                        "rows": rows, "case": name, "metric": metric,
+                        "baseline": before[metric], "current": result[metric],
+                        "change": result[metric] / before[metric] - 1,
+                    })
+    return regressions
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark loading, scoring, filtering and card rendering")
+    parser.add_argument("--sizes", type=int, nargs="+", default=SIZES, help="catalogue sizes in rows")
+    parser.add_argument("--seed", type=int, default=SEED)
+    parser.add_argument("--data-dir", help="keep the generated CSVs here (default: temporary folder)")
+    parser.add_argument("--save", help="write the report as a JSON baseline")
+    parser.add_argument("--compare", help="baseline JSON to compare against")
+    parser.add_argument("--threshold", type=float, default=REGRESSION_THRESHOLD, help="allowed relative slowdown")
+    parser.add_argument("--no-startup", action="store_true", help="skip the cold start measurements")
+    args = parser.parse_args()
+
+    if args.data_dir:
+        os.makedirs(args.data_dir, exist_ok=True)
+    report = run_benchmarks(args.sizes, args.seed, args.data_dir, not args.no_startup)
+
+    if args.save:
+        with open(args.save, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=1)
+        print(f"💾 Baseline disimpan ke '{args.save}'")
+
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            baseline = json.load(f)
+        regressions = compare(report, baseline, args.threshold)
+        print(f"🔍 Dibandingkan dengan '{args.compare}' (commit {baseline.get('environment', {}).get('commit')})")
+        for regression in regressions:
+            print(f"  ⚠️ {regression['rows']} {regression['case']}: {regression['metric']} "
+                  f"{regression['baseline']:.3f} -> {regression['current']:.3f} (+{regression['change']:.0%})")
+        if regressions:
+            sys.exit(1)
+        print("  ✅ Tidak ada regresi")
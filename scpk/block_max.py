@@ -0,0 +1,123 @@
+import numpy as np
+
+from ranking import sort_columns, sort_order
+from wp_engine import score_wp, weight_vector
+
+# Block-max index for WP top-K with upper-bound pruning, one block per Kategori x Lokasi
+# Skor WP = exp(sum w_c * log x_c) dengan bobot >= 0, jadi maksimum per blok dari setiap
+# kriteria ternormalisasi memberi batas atas skor semua baris di blok itu. Blok diperiksa
+# dari batas atas tertinggi; begitu batas atas blok berikutnya di bawah skor ke-K yang sudah
+# ditemukan, sisa blok tidak mungkin masuk top-K dan tidak disentuh sama sekali.
+class BlockMaxIndex:
+    def __init__(self, category_indexes, wp_matrix, wp_score):
+        kategori = category_indexes['Kategori']
+        lokasi = category_indexes['Lokasi']
+        self.kategori_code_of = kategori.code_of
+        self.lokasi_code_of = lokasi.code_of
+
+        # Kode blok = kode Kategori x kode Lokasi (nilai kosong, kode -1, punya blok sendiri)
+        n_lokasi = len(lokasi.code_of) + 1
+        block_of_row = (kategori.codes.astype(np.int64) + 1) * n_lokasi + (lokasi.codes + 1)
+        order = np.argsort(block_of_row, kind='stable').astype(np.int32)
+        sorted_blocks = block_of_row[order]
+        starts = np.flatnonzero(np.diff(sorted_blocks, prepend=-1))
+
+        # Posisi baris per blok, terurut naik (urutan asli dipakai sebagai pemecah seri)
+        self.rows = np.split(order, starts[1:])
+        block_codes = sorted_blocks[starts]
+        self.block_kategori = block_codes // n_lokasi - 1
+        self.block_lokasi = block_codes % n_lokasi - 1
+
+        # Maksimum per blok: fmax mengabaikan NaN, blok yang seluruhnya NaN bernilai -inf
+        if len(order):
+            self.criteria_max = np.fmax.reduceat(wp_matrix[order], starts, axis=0)
+            self.score_max = np.fmax.reduceat(wp_score[order].astype(np.float64), starts)
+        else:
+            self.criteria_max = np.empty((0, wp_matrix.shape[1]))
+            self.score_max = np.empty(0)
+        self.criteria_max = np.where(np.isnan(self.criteria_max), -np.inf, self.criteria_max)
+        self.score_max = np.where(np.isnan(self.score_max), -np.inf, self.score_max)
+
+        self.wp_matrix = wp_matrix
+        self.wp_score = wp_score
+
+    # Function to get the blocks that can hold rows of the given Kategori/Lokasi (None = semua)
+    def select_blocks(self, kategori=None, lokasi=None):
+        selected = np.ones(len(self.rows), dtype=bool)
+        if kategori is not None:
+            selected &= self.block_kategori == self.kategori_code_of.get(kategori, -2)
+        if lokasi is not None:
+            selected &= self.block_lokasi == self.lokasi_code_of.get(lokasi, -2)
+        return np.flatnonzero(selected)
+
+    # Function to get the score upper bound of every block, on the same 0-100 scale as the scores
+    # Tanpa bobot custom, skor diambil dari kolom WP_Score, sehingga batasnya adalah maksimum kolom itu
+    def upper_bounds(self, weights=None):
+        if weights is None:
+            return self.score_max
+        w = weight_vector(weights)
+        # Bobot 0 dilewati (x^0 = 1), sama seperti score_wp
+        terms = np.where(w != 0, self.criteria_max * w, 0.0)
+        with np.errstate(over='ignore', invalid='ignore'):
+            bounds = np.exp(terms.sum(axis=1)) * 100
+        # inf + -inf (blok dengan nilai 0 dan tak hingga sekaligus) tidak bisa dibatasi: selalu diperiksa.
+        # Dibulatkan ke atas (dengan sedikit kelonggaran untuk galat urutan penjumlahan float),
+        # agar tetap >= skor yang sudah dibulatkan 2 desimal
+        bounds = np.where(np.isnan(bounds), np.inf, bounds)
+        return np.ceil(bounds * (1 + 1e-9) * 100) / 100
+
+    # Function to score the given rows like recommender.wp_scores
+    def scores(self, rows, weights=None):
+        if weights is None:
+            return self.wp_score[rows]
+        return score_wp(self.wp_matrix[rows], weights)
+
+    # Function to get the top-K rows for a WP-led sort option
+    # mask: boolean per baris untuk filter lain (None = semua baris cocok).
+    # max_error = 0 memberi hasil yang sama persis dengan full sort; max_error = e berhenti lebih
+    # awal ketika sisa blok paling banyak (1 + e) kali skor ke-K, sehingga setiap skor yang
+    # terlewat <= (1 + e) x skor terendah yang dikembalikan.
+    # Returns (top positions, stats) dengan jumlah blok dan baris yang benar-benar dinilai
+    def top_k(self, k, data, sort_by, weights=None, blocks=None, mask=None, max_error=0.0):
+        if blocks is None:
+            blocks = np.arange(len(self.rows))
+        bounds = self.upper_bounds(weights)[blocks]
+        order = np.argsort(-bounds, kind='stable')
+        blocks, bounds = blocks[order], bounds[order]
+
+        candidates, candidate_scores = [], []
+        kept = 0
+        threshold = -np.inf
+        visited = scored = 0
+        for block, bound in zip(blocks, bounds):
+            if kept >= k and (bound < threshold or (max_error > 0 and bound <= threshold * (1 + max_error))):
+                break
+            visited += 1
+            rows = self.rows[block]
+            if mask is not None:
+                rows = rows[mask[rows]]
+            if len(rows) == 0:
+                continue
+            scores = self.scores(rows, weights).astype(np.float64)
+            scored += len(rows)
+            candidates.append(rows)
+            candidate_scores.append(np.where(np.isnan(scores), -np.inf, scores))
+            kept += len(rows)
+
+            # Skor ke-K sementara: baris yang tidak bisa melewatinya dibuang agar kandidat tetap kecil
+            if kept >= k:
+                rows, scores = np.concatenate(candidates), np.concatenate(candidate_scores)
+                threshold = np.partition(scores, len(scores) - k)[len(scores) - k]
+                keep = scores >= threshold
+                candidates, candidate_scores = [rows[keep]], [scores[keep]]
+                kept = int(keep.sum())
+
+        stats = {'blocks': len(blocks), 'blocks_scored': visited, 'rows_scored': scored}
+        if not candidates:
+            return np.empty(0, dtype=np.int32), stats
+
+        # Urutan akhir memakai sort_order yang sama dengan jalur tanpa pruning (kunci kedua, NaN, seri)
+        rows = np.sort(np.concatenate(candidates))
+        keys = {column: data[column].iloc[rows] for column in sort_columns(sort_by) if column != 'WP_Score'}
+        keys['WP_Score'] = self.scores(rows, weights)
+        return rows[sort_order(keys, sort_by, k)[:k]], stats
@@ -0,0 +1,62 @@
+import math
+import os
+from functools import lru_cache
+
+# Default number of food cards per results page
+PAGE_SIZE = 24
+
+# Stylesheet of the app (premium glassmorphism), disimpan di samping modul ini
+STYLE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "style.css")
+
+# Function to compute the number of pages for a result count
+def page_count(total, page_size=PAGE_SIZE):
+    return max(1, math.ceil(total / page_size))
+
+# Function to get the [start, stop) row range of a page (page dimulai dari 1)
+def page_bounds(page, total, page_size=PAGE_SIZE):
+    page = min(max(1, page), page_count(total, page_size))
+    start = (page - 1) * page_size
+    return start, min(start + page_size, total)
+
+# Function to get the app stylesheet as one <style> block, read once per process
+# String yang sama persis setiap rerun: Streamlit menyimpan message sebesar ini di browser
+# (minCachedMessageSize 10 KB), sehingga isinya hanya dikirim sekali per session
+@lru_cache(maxsize=None)
+def page_css(path=STYLE_PATH):
+    with open(path, encoding="utf-8") as f:
+        return f"<style>\n{f.read()}</style>"
+
+# Function to build the HTML of all food cards on one page in a single string
+# Template diisi per kolom (operasi string pandas), bukan per baris dengan iterrows.
+# Kolom float32 diubah lewat astype(str) sehingga tetap tampil ringkas (4.3, bukan 4.300000190734863)
+# score_column memilih skor yang ditampilkan (WP_Score, SAW_Score atau TOPSIS_Score)
+def render_food_cards(page_data, card_class="food-card", name_prefix="", description_prefix="", score_column="WP_Score"):
+    if len(page_data) == 0:
+        return ""
+
+    def text(column):
+        return page_data[column].astype(str)
+
+    # Format price with proper currency
+    formatted_price = page_data['Harga'].map("Rp {:,}".format)
+
+    cards = (
+        f'<div class="{card_class}">\n'
+        f'<div class="food-name">{name_prefix}' + text('Nama') + '</div>\n'
+        '<div class="food-info">\n'
+        '<span class="info-tag">📍 ' + text('Lokasi') + '</span>\n'
+        '<span class="info-tag">⏰ ' + text('Waktu_Makan') + '</span>\n'
+        '<span class="info-tag">💰 ' + formatted_price + '</span>\n'
+        '<span class="info-tag">🌟 ' + text('Rating') + '/5.0</span>\n'
+        '<span class="info-tag">🏷️ ' + text('Kategori') + '</span>\n'
+        f'<span class="info-tag">⚖️ {score_column.split("_")[0]}: ' + text(score_column) + '/100</span>\n'
+        '<span class="info-tag">⏱️ ' + text('Waktu_Persiapan') + ' min</span>\n'
+        '<span class="info-tag">📊 Pop: ' + text('Popularitas') + '</span>\n'
+        '<span class="info-tag">✅ ' + text('Ketersediaan') + '%</span>\n'
+        '</div>\n'
+        f'<div class="food-description">{description_prefix}' + text('Deskripsi') + '</div>\n'
+        '</div>'
+    )
+
+    # Tanpa baris kosong agar markdown tidak mengubah HTML menjadi code block
+    return "\n".join(cards.tolist())
@@ -0,0 +1,188 @@
+import copy
+import itertools
+import os
+import threading
+
+import numpy as np
+import pandas as pd
+
+from block_max import BlockMaxIndex
+from instrumentation import stage
+from indexes import CATEGORY_COLUMNS, RANGE_COLUMNS, build_category_indexes, build_range_indexes
+from scorers import criteria_bounds
+from search_index import SEARCH_COLUMNS, SearchIndex
+from wp_engine import build_criteria_matrix
+
+# Process-wide catalogue cache: satu salinan per file, dipakai bersama oleh semua session
+_catalogues = {}
+_catalogues_lock = threading.Lock()
+
+# Kolom teks berulang yang disimpan dictionary-encoded (Deskripsi template ikut di-intern)
+CATEGORICAL_COLUMNS = ['Kategori', 'Lokasi', 'Waktu_Makan', 'Deskripsi']
+
+# Kolom kriteria/skor yang disimpan sebagai float32
+FLOAT32_COLUMNS = ['Rating', 'Waktu_Persiapan', 'Popularitas', 'Ketersediaan', 'WP_Score']
+
+# Kolom yang dipakai oleh index filter dan pencarian
+INDEXED_COLUMNS = CATEGORY_COLUMNS + RANGE_COLUMNS + SEARCH_COLUMNS
+
+# Monotonic dataset version, naik setiap kali sebuah catalogue dibangun
+_versions = itertools.count(1)
+
+# Loaded catalogue shared read-only across sessions (jangan diubah in-place)
+# wp_matrix boleh diberikan bila sudah dihitung sebelumnya (misalnya dari catalogue_store);
+# bounds = (log min, log max) per kriteria untuk TOPSIS, bila matriksnya hanya sebagian (shard)
+class Catalogue:
+    def __init__(self, data, key, wp_matrix=None, bounds=None):
+        self.key = key
+        self.version = next(_versions)
+
+        with stage("catalogue_build", rows_in=len(data)) as timing:
+            # Matriks kriteria dibangun dari nilai float64 asli sebelum kolom dipadatkan
+            if wp_matrix is None:
+                wp_matrix = build_criteria_matrix(data)
+                wp_matrix.flags.writeable = False
+            self.wp_matrix = wp_matrix
+            self.data = compact_frame(data)
+
+            self.category_indexes = build_category_indexes(self.data)
+            self.range_indexes = build_range_indexes(self.data)
+            # Index teks adalah bagian termahal dan hanya dibutuhkan oleh pencarian: dibangun saat
+            # pencarian pertama (atau oleh warm_up) dan dipakai bersama oleh versi yang teksnya sama
+            search_data = self.data[[column for column in SEARCH_COLUMNS if column in self.data]]
+            self._search_index = _Lazy("search_index_build", lambda: SearchIndex(search_data))
+            self._block_index = None
+            self._bounds = bounds
+            timing.rows_out = len(self.data)
+
+    # Function to derive a new catalogue version with some columns replaced (same rows, same order)
+    # Bila kolom yang diganti tidak diindeks (misalnya Ketersediaan/WP_Score), index lama dipakai
+    # bersama dan hanya kolom tersebut yang disalin; selain itu catalogue dibangun ulang
+    def with_columns(self, columns, wp_matrix):
+        replaced = compact_frame(pd.DataFrame(columns, index=self.data.index))
+        data = self.data.assign(**{column: replaced[column] for column in replaced.columns})
+        if set(columns) & set(INDEXED_COLUMNS):
+            return Catalogue(data, self.key, wp_matrix)
+
+        catalogue = copy.copy(self)
+        catalogue.version = next(_versions)
+        catalogue.data = data
+        catalogue.wp_matrix = wp_matrix
+        # Maksimum per blok dan batas kriteria bergantung pada matriks baru, jadi dihitung ulang saat pertama dipakai
+        catalogue._block_index = None
+        catalogue._bounds = None
+        return catalogue
+
+    # Function to get the n-gram/token search index (dibangun saat pertama dipakai)
+    def search_index(self):
+        return self._search_index.get()
+
+    # Function to build the lazy indexes ahead of the first search, in a background thread
+    # Hanya sekali per index; query yang datang lebih dulu menunggu build yang sama
+    def warm_up(self):
+        if not self._search_index.started:
+            self._search_index.started = True
+            threading.Thread(target=self._search_index.get, name="catalogue-warm-up", daemon=True).start()
+
+    # Function to get the (log min, log max) of every criterion, the TOPSIS (anti-)ideal solution
+    def criteria_bounds(self):
+        if self._bounds is None:
+            self._bounds = criteria_bounds(self.wp_matrix)
+        return self._bounds
+
+    # Function to get the block-max index for pruned WP top-K (dibangun saat pertama dipakai)
+    def block_index(self):
+        if self._block_index is None:
+            with stage("block_index_build", rows_in=len(self.data)):
+                self._block_index = BlockMaxIndex(self.category_indexes, self.wp_matrix, self.data['WP_Score'].to_numpy())
+        return self._block_index
+
+# Value built on first use, at most once even with concurrent callers (name = nama stage timing)
+class _Lazy:
+    def __init__(self, name, build):
+        self.name = name
+        self._build = build
+        self._value = None
+        self._lock = threading.Lock()
+        self.started = False
+
+    def get(self):
+        if self._value is None:
+            with self._lock:
+                if self._value is None:
+                    with stage(self.name):
+                        self._value = self._build()
+                    # Referensi ke data sumber dilepas setelah dibangun
+                    self._build = None
+        return self._value
+
+# Function to store a catalogue compactly: categorical text columns, int32 Harga, float32 criteria
+def compact_frame(data):
+    columns = {}
+    for column in data.columns:
+        values = data[column]
+        if column in CATEGORICAL_COLUMNS:
+            values = values.astype('category')
+        elif column == 'Harga' and pd.api.types.is_integer_dtype(values) and len(values) \
+                and np.iinfo(np.int32).min <= values.min() and values.max() <= np.iinfo(np.int32).max:
+            values = values.astype(np.int32)
+        elif column in FLOAT32_COLUMNS and pd.api.types.is_numeric_dtype(values):
+            values = values.astype(np.float32)
+        columns[column] = values
+    # copy=False: kolom yang sudah padat (misalnya memory map) tidak disalin ulang
+    return pd.DataFrame(columns, copy=False)
+
+# Function to materialize only the given rows, with their (possibly custom) scores
+# score_column: WP_Score, atau kolom skor metode lain (SAW_Score, TOPSIS_Score)
+def take_rows(data, positions, scores=None, score_column="WP_Score"):
+    rows = data.iloc[positions]
+    if scores is not None:
+        rows = rows.assign(**{score_column: scores})
+    return rows
+
+# Function to build the cache key of a data file: (path, mtime, size)
+# File yang tidak ada tetap punya key, sehingga dataset bawaan juga ikut di-cache
+def file_key(path):
+    path = os.path.abspath(path)
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return (path, None, None)
+    return (path, stat.st_mtime_ns, stat.st_size)
+
+# Function to get the cached catalogue for a file, rebuilding it with loader() when
+# the file's path, mtime or size changed since the last load.
+# loader() mengembalikan DataFrame, atau (DataFrame, wp_matrix) bila matriksnya sudah dihitung
+def load_catalogue(path, loader):
+    key = file_key(path)
+    catalogue = _catalogues.get(key[0])
+    if catalogue is not None and catalogue.key == key:
+        return catalogue
+
+    with _catalogues_lock:
+        # Session lain mungkin sudah memuat ulang selagi menunggu lock
+        catalogue = _catalogues.get(key[0])
+        if catalogue is None or catalogue.key != key:
+            loaded = loader()
+            data, wp_matrix = loaded if isinstance(loaded, tuple) else (loaded, None)
+            catalogue = Catalogue(data, key, wp_matrix)
+            _catalogues[key[0]] = catalogue
+        return catalogue
+
+# Function to atomically replace a cached catalogue with a newer version of it
+# Hanya berhasil bila expected masih versi yang sedang dipakai; session yang sedang berjalan
+# tetap memegang versi lamanya sampai rerun berikutnya
+def publish_catalogue(catalogue, expected):
+    with _catalogues_lock:
+        if _catalogues.get(catalogue.key[0]) is not expected:
+            return False
+        _catalogues[catalogue.key[0]] = catalogue
+        return True
+
+# Function to drop cached catalogues (semua, atau hanya untuk satu file)
+def clear_catalogue_cache(path=None):
+    with _catalogues_lock:
+        if path is None:
+            _catalogues.clear()
+        else:
+            _catalogues.pop(os.path.abspath(path), None)
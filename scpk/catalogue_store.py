@@ -0,0 +1,303 @@
+import itertools
+import json
+import os
+import shutil
+import uuid
+
+import numpy as np
+import pandas as pd
+
+from catalogue import CATEGORICAL_COLUMNS, compact_frame
+from instrumentation import stage
+from wp_engine import build_criteria_matrix, criteria_stats, merge_criteria_stats, score_wp
+
+# Format catalogue biner (satu folder):
+#   manifest.json           -> daftar kolom, jumlah baris, statistik normalisasi, generasi aktif
+#   <generasi>/<kolom>.npy  -> satu file .npy per kolom, dibaca dengan np.load(mmap_mode='r')
+#   <generasi>/wp_matrix.npy -> matriks kriteria log-normalized yang sudah dihitung
+# Kolom teks disimpan dictionary-encoded: kode int + kamus (UTF-8 blob dan offset karakter).
+# File ditulis ke folder generasi baru dan manifest diganti paling akhir (os.replace),
+# sehingga proses lain yang masih me-mmap generasi lama tidak ikut terganggu.
+MANIFEST = "manifest.json"
+FORMAT_VERSION = 1
+
+# Function to get the manifest path of a catalogue store folder
+def manifest_path(path):
+    return os.path.join(path, MANIFEST)
+
+# Function to read the manifest of a catalogue store
+def read_manifest(path):
+    with open(manifest_path(path), encoding="utf-8") as f:
+        manifest = json.load(f)
+    if manifest.get("format") != FORMAT_VERSION:
+        raise ValueError(f"Unsupported catalogue format: {manifest.get('format')}")
+    return manifest
+
+# Function to check whether a store exists and is not older than its source CSV
+def store_is_current(path, source_path=None):
+    try:
+        store_mtime = os.stat(manifest_path(path)).st_mtime_ns
+    except OSError:
+        return False
+    if source_path is None or not os.path.exists(source_path):
+        return True
+    return store_mtime >= os.stat(source_path).st_mtime_ns
+
+# Function to save one array as .npy and return its file name
+def _save(folder, name, array):
+    np.save(os.path.join(folder, name), np.ascontiguousarray(array), allow_pickle=False)
+    return name
+
+# Function to save a dictionary (distinct texts) as a UTF-8 blob plus character offsets
+def _save_texts(folder, name, texts):
+    lengths = np.fromiter((len(text) for text in texts), dtype=np.int64, count=len(texts))
+    offsets = np.concatenate([[0], np.cumsum(lengths)])
+    blob = np.frombuffer("".join(texts).encode("utf-8"), dtype=np.uint8)
+    return {
+        "blob": _save(folder, f"{name}.blob.npy", blob),
+        "offsets": _save(folder, f"{name}.offsets.npy", offsets),
+    }
+
+# Function to memory-map one saved array read-only (sebagai ndarray biasa, bukan np.memmap)
+def _map(folder, name):
+    return np.load(os.path.join(folder, name), mmap_mode="r").view(np.ndarray)
+
+# Function to load a dictionary saved by _save_texts
+def _load_texts(folder, files):
+    blob = _map(folder, files["blob"])
+    offsets = np.load(os.path.join(folder, files["offsets"])).tolist()
+    text = bytes(blob).decode("utf-8")
+    return [text[start:stop] for start, stop in zip(offsets[:-1], offsets[1:])]
+
+# Function to export a loaded catalogue (data with WP_Score) to the binary store
+def write_catalogue(data, path):
+    os.makedirs(path, exist_ok=True)
+    generation = uuid.uuid4().hex
+    folder = os.path.join(path, generation)
+    os.makedirs(folder)
+
+    # Matriks kriteria dan statistiknya dihitung dari nilai float64 asli sebelum dipadatkan
+    stats = criteria_stats(data)
+    wp_matrix = build_criteria_matrix(data, stats)
+    compact = compact_frame(data)
+
+    columns = []
+    for position, column in enumerate(compact.columns):
+        values = compact[column]
+        entry = {"name": column}
+        if isinstance(values.dtype, pd.CategoricalDtype) or not pd.api.types.is_numeric_dtype(values):
+            codes, uniques = pd.factorize(values, sort=True)
+            entry["kind"] = "text"
+            entry["codes"] = _save(folder, f"{position}.codes.npy", codes.astype(np.int32))
+            entry["texts"] = _save_texts(folder, str(position), [str(text) for text in uniques.tolist()])
+        else:
+            entry["kind"] = "numeric"
+            entry["values"] = _save(folder, f"{position}.npy", values.to_numpy())
+        columns.append(entry)
+
+    manifest = {
+        "format": FORMAT_VERSION,
+        "generation": generation,
+        "rows": len(compact),
+        "columns": columns,
+        "criteria_stats": stats,
+        "wp_matrix": _save(folder, "wp_matrix.npy", wp_matrix),
+    }
+    return _commit(path, manifest)
+
+# Function to make a fully written generation the active one and drop the older ones
+def _commit(path, manifest):
+    generation = manifest["generation"]
+    try:
+        previous = read_manifest(path)["generation"]
+    except (OSError, ValueError, KeyError):
+        previous = None
+
+    # Manifest baru menggantikan yang lama secara atomik
+    temp_path = manifest_path(path) + f".{generation}.tmp"
+    with open(temp_path, "w", encoding="utf-8") as f:
+        json.dump(manifest, f, ensure_ascii=False, indent=1)
+    os.replace(temp_path, manifest_path(path))
+
+    # Generasi sebelumnya disimpan sampai commit berikutnya: pembaca yang sudah membaca manifest lama
+    # masih bisa me-mmap file-nya. Generasi yang lebih tua dihapus; halaman yang masih di-mmap
+    # proses lain tetap valid sampai dilepas
+    for entry in os.listdir(path):
+        if entry not in (generation, previous) and os.path.isdir(os.path.join(path, entry)):
+            shutil.rmtree(os.path.join(path, entry), ignore_errors=True)
+    return manifest
+
+# Function to create a .npy file of a known shape, returned as a writable memory map
+def _create(folder, name, dtype, shape):
+    return np.lib.format.open_memmap(os.path.join(folder, name), mode="w+", dtype=dtype, shape=shape)
+
+# Function to summarize a stream of DataFrame chunks for the store (pass 1 of write_catalogue_chunks):
+# jumlah baris, statistik kriteria global, kamus kolom kategorikal dan dtype kolom (dari chunk pertama)
+def summarize_chunks(chunks):
+    rows = 0
+    stats = []
+    dictionaries = {}
+    dtypes = None
+    for chunk in chunks:
+        compact = compact_frame(chunk)
+        if dtypes is None:
+            dtypes = compact.dtypes
+        rows += len(chunk)
+        stats.append(criteria_stats(chunk))
+        for column in compact.columns:
+            if column in CATEGORICAL_COLUMNS:
+                dictionaries.setdefault(column, set()).update(compact[column].dropna().unique().tolist())
+    if dtypes is None:
+        raise ValueError("No chunks to write")
+    return {"rows": rows, "criteria_stats": merge_criteria_stats(stats), "dictionaries": dictionaries, "dtypes": dtypes}
+
+# Function to export a catalogue given as a stream of DataFrame chunks, in bounded memory
+# chunks() harus menghasilkan chunk yang sama setiap kali dipanggil (dibaca dua kali):
+# - pass 1: summarize_chunks (jumlah baris, statistik kriteria global, kamus kolom kategorikal)
+# - pass 2: kolom ditulis langsung ke file .npy lewat memory map, beserta baris matriks
+#   kriteria yang dinormalisasi dengan statistik global
+# Bila summary sudah dihitung pemanggil (misalnya preprocessing, per shard saat membersihkan),
+# pass 1 dilewati dan chunks() hanya dibaca sekali; dtype kolom lalu diambil dari chunk pertama.
+# Bila chunk belum punya WP_Score, skornya dihitung dengan weights dari matriks tersebut.
+# Kolom teks non-kategorikal (misalnya Nama) disimpan per baris tanpa kamus bersama.
+def write_catalogue_chunks(chunks, path, weights=None, summary=None):
+    if summary is None:
+        summary = summarize_chunks(chunks())
+    stream = iter(chunks()) if summary.get("dtypes") is None else None
+    if stream is not None:
+        first = next(stream, None)
+        if first is None:
+            raise ValueError("No chunks to write")
+        summary = dict(summary, dtypes=compact_frame(first).dtypes)
+        stream = itertools.chain([first], stream)
+    rows, stats, dtypes = summary["rows"], summary["criteria_stats"], summary["dtypes"]
+    dictionaries = {column: sorted(str(text) for text in texts) for column, texts in summary["dictionaries"].items()}
+
+    os.makedirs(path, exist_ok=True)
+    generation = uuid.uuid4().hex
+    folder = os.path.join(path, generation)
+    os.makedirs(folder)
+
+    columns = list(dtypes.index)
+    if "WP_Score" not in columns:
+        if weights is None:
+            raise ValueError("Chunks without WP_Score need weights to score them")
+        columns.append("WP_Score")
+    wp_matrix = _create(folder, "wp_matrix.npy", np.float64, (rows, len(stats)))
+
+    # Per kolom: entri manifest + memory map tujuan (values/codes, offsets dan blob untuk teks per baris)
+    entries, targets = [], {}
+    for position, column in enumerate(columns):
+        entry = {"name": column}
+        target = {}
+        dtype = dtypes[column] if column in dtypes else np.dtype(np.float32)
+        if column in dictionaries:
+            entry["kind"] = "text"
+            entry["codes"] = f"{position}.codes.npy"
+            entry["texts"] = _save_texts(folder, str(position), dictionaries[column])
+            target["codes"] = _create(folder, entry["codes"], np.int32, (rows,))
+        elif pd.api.types.is_numeric_dtype(dtype):
+            entry["kind"] = "numeric"
+            entry["values"] = f"{position}.npy"
+            target["values"] = _create(folder, entry["values"], dtype, (rows,))
+        else:
+            entry["kind"] = "text"
+            entry["codes"] = f"{position}.codes.npy"
+            entry["texts"] = {"blob": f"{position}.blob.npy", "offsets": f"{position}.offsets.npy"}
+            target["codes"] = _create(folder, entry["codes"], np.int32, (rows,))
+            target["offsets"] = _create(folder, entry["texts"]["offsets"], np.int64, (rows + 1,))
+            target["offsets"][0] = 0
+            # Blob ditulis berurutan ke file sementara, lalu dibungkus menjadi .npy di akhir
+            target["blob"] = open(os.path.join(folder, entry["texts"]["blob"] + ".tmp"), "wb")
+            target["characters"] = 0
+        entries.append(entry)
+        targets[column] = target
+
+    start = 0
+    for chunk in stream if stream is not None else chunks():
+        stop = start + len(chunk)
+        matrix = build_criteria_matrix(chunk, stats)
+        wp_matrix[start:stop] = matrix
+        if "WP_Score" not in chunk:
+            chunk = chunk.assign(WP_Score=score_wp(matrix, weights))
+        compact = compact_frame(chunk)
+
+        for entry in entries:
+            column, values, target = entry["name"], compact[entry["name"]], targets[entry["name"]]
+            if entry["kind"] == "numeric":
+                target["values"][start:stop] = values.to_numpy(dtype=target["values"].dtype)
+            elif column in dictionaries:
+                target["codes"][start:stop] = pd.Categorical(values.astype(object), categories=dictionaries[column]).codes
+            else:
+                present = values.notna().to_numpy()
+                texts = [text if ok else "" for text, ok in zip(values.astype(object).tolist(), present)]
+                lengths = np.fromiter((len(text) for text in texts), dtype=np.int64, count=len(texts))
+                target["offsets"][start + 1:stop + 1] = target["characters"] + np.cumsum(lengths)
+                target["characters"] += int(lengths.sum())
+                target["codes"][start:stop] = np.where(present, np.arange(start, stop), -1)
+                target["blob"].write("".join(texts).encode("utf-8"))
+        start = stop
+
+    wp_matrix.flush()
+    for entry in entries:
+        for name, target in targets[entry["name"]].items():
+            if name == "blob":
+                target.close()
+                _wrap_blob(folder, entry["texts"]["blob"])
+            elif isinstance(target, np.ndarray):
+                target.flush()
+
+    manifest = {
+        "format": FORMAT_VERSION,
+        "generation": generation,
+        "rows": rows,
+        "columns": entries,
+        "criteria_stats": stats,
+        "wp_matrix": "wp_matrix.npy",
+    }
+    return _commit(path, manifest)
+
+# Function to turn a raw byte file (<name>.tmp) into a uint8 .npy without loading it
+def _wrap_blob(folder, name):
+    raw_path = os.path.join(folder, name + ".tmp")
+    size = os.path.getsize(raw_path)
+    with open(os.path.join(folder, name), "wb") as f, open(raw_path, "rb") as raw:
+        np.lib.format.write_array_header_1_0(f, {"descr": "|u1", "fortran_order": False, "shape": (size,)})
+        while block := raw.read(1 << 20):
+            f.write(block)
+    os.remove(raw_path)
+
+# Function to load the binary store as (data, wp_matrix) without parsing any CSV
+# Kolom numerik dan kode kategori adalah memory map read-only (zero-copy, halaman dipakai
+# bersama oleh semua proses); hanya kamus teks yang didekode menjadi string Python
+def read_catalogue(path):
+    with stage("store_load") as timing:
+        try:
+            data, wp_matrix = _read_catalogue(path)
+        except FileNotFoundError:
+            # Dua commit terjadi antara membaca manifest dan me-mmap file-nya: baca ulang manifest sekali
+            data, wp_matrix = _read_catalogue(path)
+        timing.rows_out = len(data)
+    return data, wp_matrix
+
+def _read_catalogue(path):
+    manifest = read_manifest(path)
+    folder = os.path.join(path, manifest["generation"])
+
+    columns = {}
+    for entry in manifest["columns"]:
+        if entry["kind"] == "numeric":
+            columns[entry["name"]] = pd.Series(_map(folder, entry["values"]), copy=False)
+            continue
+
+        codes = _map(folder, entry["codes"])
+        texts = pd.Index(_load_texts(folder, entry["texts"]))
+        if entry["name"] in CATEGORICAL_COLUMNS:
+            columns[entry["name"]] = pd.Series(pd.Categorical.from_codes(codes, texts), copy=False)
+        else:
+            # Teks unik per baris (misalnya Nama) tetap dikembalikan sebagai kolom string biasa
+            columns[entry["name"]] = pd.Series(texts.take(codes, allow_fill=True, fill_value=np.nan))
+
+    data = pd.DataFrame(columns, copy=False)
+    wp_matrix = _map(folder, manifest["wp_matrix"])
+    return data, wp_matrix
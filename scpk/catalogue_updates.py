@@ -0,0 +1,174 @@
+import heapq
+from collections import Counter
+
+import numpy as np
+import pandas as pd
+
+from food_data import default_weights
+from wp_engine import BENEFIT, CRITERIA, build_criteria_matrix, score_wp
+
+# Multiset of one criterion's values with O(log n) min/max under inserts and deletes
+# Heap min dan max memakai lazy deletion: nilai yang sudah habis di Counter dibuang saat muncul di puncak
+class Extrema:
+    def __init__(self, values=()):
+        self.counts = Counter(value for value in values if value == value)
+        self._low = list(self.counts)
+        self._high = [-value for value in self.counts]
+        heapq.heapify(self._low)
+        heapq.heapify(self._high)
+
+    # Function to add values (NaN diabaikan, sama seperti data yang sudah dibersihkan)
+    def add(self, values):
+        for value in values:
+            if value != value:
+                continue
+            if self.counts[value] == 0:
+                heapq.heappush(self._low, value)
+                heapq.heappush(self._high, -value)
+            self.counts[value] += 1
+
+    # Function to remove values that were added before
+    def remove(self, values):
+        for value in values:
+            if value != value:
+                continue
+            self.counts[value] -= 1
+            if self.counts[value] <= 0:
+                del self.counts[value]
+
+    # Function to get the smallest value still present
+    def min(self):
+        while self._low and self._low[0] not in self.counts:
+            heapq.heappop(self._low)
+        return self._low[0] if self._low else None
+
+    # Function to get the largest value still present
+    def max(self):
+        while self._high and -self._high[0] not in self.counts:
+            heapq.heappop(self._high)
+        return -self._high[0] if self._high else None
+
+# Editable copy of a catalogue with delta-maintained WP normalization
+# Baris diidentifikasi dengan label index DataFrame (id), yang tidak berubah saat ada delete.
+# Normalisasi WP hanya bergantung pada max (benefit) dan min (cost) tiap kriteria, jadi:
+# - bila batas itu tidak berubah, hanya baris yang baru/diubah yang diberi skor ulang
+# - bila batas berubah, seluruh catalogue diberi skor ulang (satu operasi vektor)
+class CatalogueEditor:
+    def __init__(self, data, weights=None):
+        self.weights = default_weights if weights is None else weights
+        self.data = data.copy()
+        if not self.data.index.is_unique or not pd.api.types.is_integer_dtype(self.data.index):
+            self.data = self.data.reset_index(drop=True)
+        self._next_id = int(self.data.index.max()) + 1 if len(self.data) else 0
+
+        self.extrema = {c: Extrema(self.data[c].to_numpy(dtype=np.float64).tolist()) for c in CRITERIA}
+        self._bounds = self.bounds()
+
+        # Penghitung untuk memantau berapa banyak pekerjaan scoring yang dilakukan
+        self.full_rescores = 0
+        self.rows_rescored = 0
+
+        # Skor bawaan hanya dipakai bila bisa direproduksi dari kriteria, batas dan bobot editor ini;
+        # selain itu baris yang diberi skor ulang akan bercampur dengan skor dari basis lain
+        if 'WP_Score' not in self.data or not self._scores_match():
+            self._rescore_all()
+
+    # Function to get the current normalization stats ({kriteria: {'min', 'max'}})
+    def stats(self):
+        return {c: {'min': self.extrema[c].min(), 'max': self.extrema[c].max()} for c in CRITERIA}
+
+    # Function to get the values the normalization divides by: max for benefit, min for cost
+    def bounds(self):
+        return tuple(self.extrema[c].max() if benefit else self.extrema[c].min() for c, benefit in zip(CRITERIA, BENEFIT))
+
+    # Function to add new dishes; returns their ids
+    def append(self, rows):
+        missing = [c for c in CRITERIA if c not in rows]
+        if missing:
+            raise ValueError(f"New rows are missing criteria columns: {missing}")
+
+        ids = np.arange(self._next_id, self._next_id + len(rows))
+        self._next_id += len(rows)
+        rows = rows.set_axis(ids)
+        for c in CRITERIA:
+            self.extrema[c].add(rows[c].to_numpy(dtype=np.float64).tolist())
+
+        self.data = pd.concat([self.data, rows.drop(columns='WP_Score', errors='ignore')])
+        self._rescore(ids)
+        return ids
+
+    # Function to change column values of existing dishes
+    # values: DataFrame ber-index id, atau dict kolom -> nilai (skalar atau satu nilai per id)
+    # Id ganda hanya diterapkan sekali, dengan nilai terakhirnya (seperti update berurutan)
+    def update(self, ids, values):
+        changes = values if isinstance(values, pd.DataFrame) else pd.DataFrame(values, index=np.asarray(ids))
+        changes = changes[~changes.index.duplicated(keep='last')]
+        ids = self._existing_ids(ids)
+        missing = ids[~np.isin(ids, changes.index)]
+        if len(missing):
+            raise ValueError(f"No values given for dish ids: {missing.tolist()}")
+        changes = changes.loc[ids]
+
+        changed_criteria = [c for c in CRITERIA if c in changes]
+        for c in changed_criteria:
+            self.extrema[c].remove(self.data.loc[ids, c].to_numpy(dtype=np.float64).tolist())
+            self.extrema[c].add(changes[c].to_numpy(dtype=np.float64).tolist())
+        for column in changes.columns:
+            self.data.loc[ids, column] = changes[column].to_numpy()
+
+        if changed_criteria:
+            self._rescore(ids)
+
+    # Function to remove dishes by id (id ganda dihapus sekali)
+    def delete(self, ids):
+        ids = self._existing_ids(ids)
+        for c in CRITERIA:
+            self.extrema[c].remove(self.data.loc[ids, c].to_numpy(dtype=np.float64).tolist())
+        self.data = self.data.drop(index=ids)
+
+        # Baris yang dihapus tidak perlu skor; yang lain hanya bila batas normalisasi bergeser
+        self._rescore(ids[:0])
+
+    # Function to get the given ids once each (np.unique), checked before anything is changed
+    # Id yang tidak ada akan membuat Extrema tidak sinkron dengan data, jadi ditolak dengan ValueError
+    def _existing_ids(self, ids):
+        ids = np.unique(np.asarray(ids))
+        unknown = ids[~np.isin(ids, self.data.index)]
+        if len(unknown):
+            raise ValueError(f"Unknown dish ids: {unknown.tolist()}")
+        return ids
+
+    # Function to rescore the given rows, or everything if a normalization bound moved
+    def _rescore(self, ids):
+        bounds = self.bounds()
+        if bounds != self._bounds:
+            self._bounds = bounds
+            self._rescore_all()
+        elif len(ids):
+            rows = self.data.loc[ids, CRITERIA]
+            self.data.loc[ids, 'WP_Score'] = score_wp(build_criteria_matrix(rows, self.stats()), self.weights)
+            self.rows_rescored += len(ids)
+
+    # Function to check that the seeded WP_Score equals the score of the current criteria
+    def _scores_match(self):
+        # Skor baru (float64, 2 desimal) harus bisa ditulis ke kolom ini tanpa kehilangan presisi
+        self.data['WP_Score'] = self.data['WP_Score'].astype(np.float64)
+        if len(self.data) == 0:
+            return True
+        # Toleransi jauh di bawah pembulatan 2 desimal: kolom yang disimpan boleh float32
+        expected = score_wp(build_criteria_matrix(self.data, self.stats()), self.weights)
+        return np.allclose(self.data['WP_Score'].to_numpy(), expected, rtol=0, atol=1e-3, equal_nan=True)
+
+    # Function to recompute WP_Score of every dish with the current bounds
+    def _rescore_all(self):
+        if len(self.data):
+            self.data['WP_Score'] = score_wp(build_criteria_matrix(self.data, self.stats()), self.weights)
+        self.full_rescores += 1
+        self.rows_rescored += len(self.data)
+
+    # Function to get the current catalogue as (data, wp_matrix), ready for Catalogue/load_catalogue
+    def snapshot(self):
+        data = self.data.reset_index(drop=True)
+        wp_matrix = build_criteria_matrix(data, self.stats())
+        wp_matrix.flags.writeable = False
+        return data, wp_matrix
@@ -0,0 +1,295 @@
+import argparse
+
+import pandas as pd
+import numpy as np
+from wp_engine import build_criteria_matrix, score_wp
+from catalogue import load_catalogue
+from instrumentation import stage
+from catalogue_store import manifest_path, read_catalogue, store_is_current, write_catalogue
+
+# Default weights for WP calculation
+default_weights = {
+    'Rating': 0.25,
+    'Harga': 0.20,
+    'Waktu_Persiapan': 0.15,
+    'Popularitas': 0.25,
+    'Ketersediaan': 0.15
+}
+
+# Function to calculate Weighted Product Score
+def calculate_wp_score(data, weights=None):
+    if weights is None:
+        weights = default_weights
+    
+    # Create a copy to avoid modifying original data
+    df = data.copy()
+    
+    # Add missing columns with sample data if they don't exist
+    if 'Waktu_Persiapan' not in df.columns:
+        np.random.seed(42)
+        df['Waktu_Persiapan'] = np.random.randint(15, 120, len(df))  # 15-120 minutes
+    
+    if 'Popularitas' not in df.columns:
+        np.random.seed(43)
+        df['Popularitas'] = np.random.randint(50, 1000, len(df))  # 50-1000 popularity score
+    
+    if 'Ketersediaan' not in df.columns:
+        np.random.seed(44)
+        df['Ketersediaan'] = np.random.randint(70, 100, len(df))  # 70-100% availability
+    
+    # Normalization + WP Score ∏(xi^wi) via the log-normalized criteria matrix
+    with stage("wp_score", rows_in=len(df)) as timing:
+        wp_matrix = build_criteria_matrix(df)
+        df['WP_Score'] = score_wp(wp_matrix, weights)
+        timing.rows_out = len(df)
+    
+    return df
+
+# Function to generate the food dataset
+def generate_food_dataset():
+    # Data sample yang sudah ditentukan dengan lengkap (tidak random)
+    sample_data = [
+        # KATEGORI ASIN
+        {
+            "Nama": "Kerupuk Udang",
+            "Kategori": "Asin",
+            "Harga": 12000,
+            "Waktu_Makan": "Camilan",
+            "Lokasi": "Jakarta",
+            "Deskripsi": "Kerupuk renyah dengan rasa udang yang gurih",
+            "Rating": 4.2,
+            "Waktu_Persiapan": 10,  # menit
+            "Popularitas": 750,     # skor popularitas
+            "Ketersediaan": 95      # persen
+        },
+        {
+            "Nama": "Telur Asin",
+            "Kategori": "Asin",
+            "Harga": 6000,
+            "Waktu_Makan": "Sarapan",
+            "Lokasi": "Brebes",
+            "Deskripsi": "Telur bebek yang diasinkan dengan cita rasa khas",
+            "Rating": 4.0,
+            "Waktu_Persiapan": 5,
+            "Popularitas": 620,
+            "Ketersediaan": 88
+        },
+        {
+            "Nama": "Ikan Teri Medan",
+            "Kategori": "Asin",
+            "Harga": 28000,
+            "Waktu_Makan": "Makan Siang",
+            "Lokasi": "Medan",
+            "Deskripsi": "Ikan teri kering khas Medan yang gurih",
+            "Rating": 4.5,
+            "Waktu_Persiapan": 15,
+            "Popularitas": 480,
+            "Ketersediaan": 75
+        },
+        
+        # KATEGORI MANIS
+        {
+            "Nama": "Es Krim Vanila",
+            "Kategori": "Manis",
+            "Harga": 18000,
+            "Waktu_Makan": "Camilan",
+            "Lokasi": "Bandung",
+            "Deskripsi": "Es krim lembut dengan rasa vanila klasik",
+            "Rating": 4.3,
+            "Waktu_Persiapan": 3,
+            "Popularitas": 890,
+            "Ketersediaan": 92
+        },
+        {
+            "Nama": "Klepon",
+            "Kategori": "Manis",
+            "Harga": 12000,
+            "Waktu_Makan": "Camilan",
+            "Lokasi": "Yogyakarta",
+            "Deskripsi": "Kue tradisional dengan isian gula merah",
+            "Rating": 4.1,
+            "Waktu_Persiapan": 30,
+            "Popularitas": 560,
+            "Ketersediaan": 80
+        },
+        {
+            "Nama": "Martabak Manis",
+            "Kategori": "Manis",
+            "Harga": 35000,
+            "Waktu_Makan": "Makan Malam",
+            "Lokasi": "Jakarta",
+            "Deskripsi": "Martabak tebal dengan berbagai topping manis",
+            "Rating": 4.6,
+            "Waktu_Persiapan": 20,
+            "Popularitas": 950,
+            "Ketersediaan": 85
+        },
+        
+        # KATEGORI PEDAS
+        {
+            "Nama": "Ayam Geprek",
+            "Kategori": "Pedas",
+            "Harga": 25000,
+            "Waktu_Makan": "Makan Siang",
+            "Lokasi": "Surabaya",
+            "Deskripsi": "Ayam crispy dengan sambal pedas yang menggigit",
+            "Rating": 4.4,
+            "Waktu_Persiapan": 25,
+            "Popularitas": 820,
+            "Ketersediaan": 90
+        },
+        {
+            "Nama": "Seblak Kerupuk",
+            "Kategori": "Pedas",
+            "Harga": 18000,
+            "Waktu_Makan": "Camilan",
+            "Lokasi": "Bandung",
+            "Deskripsi": "Makanan berkuah pedas dengan kerupuk",
+            "Rating": 4.2,
+            "Waktu_Persiapan": 15,
+            "Popularitas": 670,
+            "Ketersediaan": 85
+        },
+        {
+            "Nama": "Nasi Padang",
+            "Kategori": "Pedas",
+            "Harga": 35000,
+            "Waktu_Makan": "Makan Siang",
+            "Lokasi": "Padang",
+            "Deskripsi": "Nasi dengan lauk khas Padang yang pedas",
+            "Rating": 4.7,
+            "Waktu_Persiapan": 10,
+            "Popularitas": 900,
+            "Ketersediaan": 95
+        },
+        
+        # KATEGORI ASAM
+        {
+            "Nama": "Rujak Buah",
+            "Kategori": "Asam",
+            "Harga": 15000,
+            "Waktu_Makan": "Camilan",
+            "Lokasi": "Jakarta",
+            "Deskripsi": "Campuran buah segar dengan bumbu asam pedas",
+            "Rating": 4.0,
+            "Waktu_Persiapan": 10,
+            "Popularitas": 720,
+            "Ketersediaan": 85
+        },
+        {
+            "Nama": "Es Jeruk",
+            "Kategori": "Asam",
+            "Harga": 12000,
+            "Waktu_Makan": "Semua",
+            "Lokasi": "Bali",
+            "Deskripsi": "Minuman segar dengan rasa jeruk asam",
+            "Rating": 3.9,
+            "Waktu_Persiapan": 5,
+            "Popularitas": 650,
+            "Ketersediaan": 95
+        },
+        {
+            "Nama": "Asinan Betawi",
+            "Kategori": "Asam",
+            "Harga": 17000,
+            "Waktu_Makan": "Camilan",
+            "Lokasi": "Jakarta",
+            "Deskripsi": "Asinan khas Betawi dengan rasa asam segar",
+            "Rating": 4.1,
+            "Waktu_Persiapan": 8,
+            "Popularitas": 580,
+            "Ketersediaan": 80
+        },
+        
+        # KATEGORI GURIH/UMAMI
+        {
+            "Nama": "Nasi Gudeg",
+            "Kategori": "Gurih/Umami",
+            "Harga": 30000,
+            "Waktu_Makan": "Makan Siang",
+            "Lokasi": "Yogyakarta",
+            "Deskripsi": "Nasi dengan gudeg khas Yogyakarta",
+            "Rating": 4.5,
+            "Waktu_Persiapan": 15,
+            "Popularitas": 780,
+            "Ketersediaan": 90
+        },
+        {
+            "Nama": "Sate Ayam",
+            "Kategori": "Gurih/Umami",
+            "Harga": 35000,
+            "Waktu_Makan": "Makan Malam",
+            "Lokasi": "Solo",
+            "Deskripsi": "Sate ayam dengan bumbu kacang gurih",
+            "Rating": 4.6,
+            "Waktu_Persiapan": 30,
+            "Popularitas": 860,
+            "Ketersediaan": 88
+        },
+        {
+            "Nama": "Rendang Daging",
+            "Kategori": "Gurih/Umami",
+            "Harga": 50000,
+            "Waktu_Makan": "Makan Siang",
+            "Lokasi": "Padang",
+            "Deskripsi": "Daging sapi dengan bumbu rendang khas",
+            "Rating": 4.8,
+            "Waktu_Persiapan": 120,
+            "Popularitas": 950,
+            "Ketersediaan": 75
+        }
+    ]
+    
+    df = pd.DataFrame(sample_data)
+    return df
+
+# Path of the cleaned dataset (CSV hanya dipakai sebagai jalur impor)
+DATA_PATH = "MoodRasaDataFleksibel_cleaned.csv"
+
+# Path of the exported binary catalogue (lihat catalogue_store.py)
+STORE_PATH = "MoodRasaDataFleksibel.catalogue"
+
+# Function to load the dataset and compute its default WP Score
+def load_food_data(path=DATA_PATH):
+    # Generate the dataset
+    with stage("csv_load") as timing:
+        try:
+            data = pd.read_csv(path)
+        except:
+            data = generate_food_dataset()
+        timing.rows_out = len(data)
+    
+    # Data sudah lengkap dengan Rating, Waktu_Persiapan, Popularitas, dan Ketersediaan
+    # Tidak perlu generate random lagi karena sudah didefinisikan di sample data
+    
+    # Generate random ratings for each food
+    np.random.seed(42)
+    data['Rating'] = np.random.uniform(3.8, 5.0, len(data))
+    data['Rating'] = data['Rating'].round(1)
+    
+    # Calculate WP Score for all data
+    # Dihitung setelah Rating diganti, agar WP_Score sama dengan skor dari matriks kriteria catalogue
+    # (bobot custom, editor/feed, sensitivitas) dan dengan Rating yang ditampilkan
+    data = calculate_wp_score(data, default_weights)
+    return data
+
+# Function to get the shared catalogue, memory-mapping the binary store when it is current
+# Bila store belum ada atau lebih tua dari CSV, CSV diimpor seperti biasa
+def load_food_catalogue(csv_path=DATA_PATH, store_path=STORE_PATH):
+    if store_is_current(store_path, csv_path):
+        return load_catalogue(manifest_path(store_path), lambda: read_catalogue(store_path))
+    return load_catalogue(csv_path, lambda: load_food_data(csv_path))
+
+# Function to import the CSV once and export it to the binary store
+def export_food_catalogue(csv_path=DATA_PATH, store_path=STORE_PATH):
+    data = load_food_data(csv_path)
+    manifest = write_catalogue(data, store_path)
+    print(f"✅ {manifest['rows']} item diekspor dari '{csv_path}' ke '{store_path}'")
+    return manifest
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Export the food CSV to the binary catalogue format")
+    parser.add_argument("csv_path", nargs="?", default=DATA_PATH)
+    parser.add_argument("store_path", nargs="?", default=STORE_PATH)
+    args = parser.parse_args()
+    export_food_catalogue(args.csv_path, args.store_path)
@@ -1,5 +1,7 @@
 import pandas as pd
 
+from food_data import export_food_catalogue
+
 # Data statis manual (tanpa tambahan acak)
 sample_data = [
     {'Nama': 'Donat 2', 'Kategori': 'Manis', 'Harga': 18868, 'Waktu_Makan': 'Camilan', 'Lokasi': 'Padang', 'Deskripsi': 'Makanan manis yang digemari banyak orang', 'Rating': 4.8, 'Waktu_Persiapan': 22, 'Popularitas': 569, 'Ketersediaan': 77},
@@ -214,3 +216,6 @@ if __name__ == "__main__":
     df = generate_food_dataset()
     print("\n📊 Statistik Kategori:")
     print(df["Kategori"].value_counts())
+
+    # Ekspor juga ke format catalogue biner yang dibaca aplikasi (CSV hanya jalur impor)
+    export_food_catalogue()
@@ -0,0 +1,119 @@
+import numpy as np
+import pandas as pd
+
+# Kolom kategorikal yang diberi inverted index
+CATEGORY_COLUMNS = ['Kategori', 'Lokasi', 'Waktu_Makan']
+
+# Kolom numerik yang diberi sorted range index
+RANGE_COLUMNS = ['Harga', 'Rating']
+
+# Inverted index of one categorical column: per-value sorted row positions
+class CategoryIndex:
+    def __init__(self, column):
+        codes, uniques = pd.factorize(column)
+        self.codes = codes.astype(np.int32)
+        self.codes.flags.writeable = False
+        self.code_of = {value: code for code, value in enumerate(uniques.tolist())}
+
+        # Posting list per nilai: posisi baris terurut naik (argsort stabil atas kode)
+        order = np.argsort(self.codes, kind='stable').astype(np.int32)
+        counts = np.bincount(self.codes[self.codes >= 0], minlength=len(uniques))
+        starts = np.searchsorted(self.codes[order], np.arange(len(uniques)))
+        self._postings = [order[start:start + count] for start, count in zip(starts, counts)]
+        for postings in self._postings:
+            postings.flags.writeable = False
+
+    # Function to get the codes of a list of values (nilai yang tidak ada diabaikan)
+    def codes_for(self, values):
+        return [self.code_of[value] for value in values if value in self.code_of]
+
+    # Function to count the rows matching any of the values
+    def count(self, values):
+        return sum(len(self._postings[code]) for code in self.codes_for(values))
+
+    # Function to get the sorted positions of rows matching any of the values
+    def lookup(self, values):
+        postings = [self._postings[code] for code in self.codes_for(values)]
+        if not postings:
+            return np.empty(0, dtype=np.int32)
+        if len(postings) == 1:
+            return postings[0]
+        return np.sort(np.concatenate(postings))
+
+    # Function to keep only the candidate positions whose value is one of values
+    def contains(self, positions, values):
+        codes = self.codes_for(values)
+        if not codes:
+            return np.zeros(len(positions), dtype=bool)
+        if len(codes) == 1:
+            return self.codes[positions] == codes[0]
+        return np.isin(self.codes[positions], codes)
+
+# Sorted index of one numeric column for inclusive [low, high] range queries
+class RangeIndex:
+    def __init__(self, column):
+        # Kolom float (misalnya Rating float32) dipakai apa adanya agar batas dibandingkan
+        # dengan presisi yang sama seperti nilainya
+        if pd.api.types.is_float_dtype(column):
+            self.values = column.to_numpy()
+        else:
+            self.values = column.to_numpy(dtype=np.float64, na_value=np.nan)
+        self.values.flags.writeable = False
+
+        # Posisi baris diurutkan berdasarkan nilai (NaN di akhir dan tidak pernah cocok)
+        self.order = np.argsort(self.values, kind='stable').astype(np.int32)
+        sorted_values = self.values[self.order]
+        self.sorted_values = sorted_values[:np.count_nonzero(~np.isnan(sorted_values))]
+        self.order.flags.writeable = False
+        self.sorted_values.flags.writeable = False
+
+    # Function to find the slice of the sorted order inside [low, high] with bisection
+    def _bounds(self, value_range):
+        low, high = value_range
+        start = np.searchsorted(self.sorted_values, low, side='left')
+        stop = np.searchsorted(self.sorted_values, high, side='right')
+        return start, max(start, stop)
+
+    # Function to count the rows inside the range in O(log n)
+    def count(self, value_range):
+        start, stop = self._bounds(value_range)
+        return stop - start
+
+    # Function to get the sorted positions of rows inside the range in O(log n + k log k)
+    def lookup(self, value_range):
+        start, stop = self._bounds(value_range)
+        if stop - start == len(self.values):
+            return np.arange(len(self.values), dtype=np.int32)
+        return np.sort(self.order[start:stop])
+
+    # Function to keep only the candidate positions whose value is inside the range
+    def contains(self, positions, value_range):
+        low, high = value_range
+        values = self.values[positions]
+        return (values >= low) & (values <= high)
+
+# Function to build the categorical indexes of a catalogue
+def build_category_indexes(data):
+    return {column: CategoryIndex(data[column]) for column in CATEGORY_COLUMNS if column in data}
+
+# Function to build the numeric range indexes of a catalogue
+def build_range_indexes(data):
+    return {column: RangeIndex(data[column]) for column in RANGE_COLUMNS if column in data}
+
+# Function to intersect filter predicates [(index, argument), ...]
+# argument berupa daftar nilai untuk CategoryIndex atau (low, high) untuk RangeIndex.
+# Mulai dari predikat paling selektif, lalu predikat lain dicek hanya pada kandidat tersebut,
+# sehingga biayanya sebanding dengan jumlah baris yang cocok, bukan full scan
+def match_filters(predicates, n_rows):
+    if not predicates:
+        return np.arange(n_rows, dtype=np.int32)
+
+    predicates = sorted(predicates, key=lambda p: p[0].count(p[1]))
+    index, argument = predicates[0]
+    positions = index.lookup(argument)
+
+    for index, argument in predicates[1:]:
+        if len(positions) == 0:
+            break
+        positions = positions[index.contains(positions, argument)]
+    return positions
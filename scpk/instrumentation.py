@@ -0,0 +1,301 @@
+import json
+import os
+import sys
+import threading
+import time
+import tracemalloc
+
+# Per-stage instrumentation of the hot path (load, score, filter, sort, render)
+# Dimatikan secara default: stage() dan trace() lalu mengembalikan objek no-op yang sama,
+# sehingga biayanya hanya satu pemanggilan fungsi. Nyalakan dengan MOODRASA_INSTRUMENT=1,
+# atau MOODRASA_INSTRUMENT=alloc untuk ikut mengukur alokasi memori (tracemalloc, jauh lebih lambat).
+# Mode alloc hanya untuk satu thread (satu session Streamlit, skrip): peak tracemalloc berlaku untuk
+# seluruh proses, jadi stage yang berjalan bersamaan di thread lain saling me-reset peak-nya dan
+# angka alokasinya salah. Server API (banyak worker thread) menolak mode ini.
+MODE = os.environ.get("MOODRASA_INSTRUMENT", "").strip().lower()
+ENABLED = MODE not in ("", "0", "off", "false")
+TRACK_ALLOCATIONS = MODE == "alloc"
+
+# Setiap trace yang selesai ditulis sebagai satu baris JSON ke stderr (MOODRASA_INSTRUMENT_LOG=0 mematikannya)
+LOG_TRACES = os.environ.get("MOODRASA_INSTRUMENT_LOG", "1") != "0"
+
+# Batas atas bucket histogram durasi (detik) untuk endpoint Prometheus
+BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+# Target cold start: detik dari awal proses sampai response/render pertama
+STARTUP_TARGET_SECONDS = float(os.environ.get("MOODRASA_STARTUP_TARGET", 5.0))
+
+# Trace yang sedang berjalan di thread ini (satu rerun Streamlit atau satu request API)
+_local = threading.local()
+
+# Timing of one stage; rows_out diisi oleh pemanggil di dalam blok with
+class Stage:
+    def __init__(self, name, rows_in=None):
+        self.name = name
+        self.rows_in = rows_in
+        self.rows_out = None
+        self.seconds = 0.0
+        self.alloc_bytes = None
+        self.depth = 0
+        self._peak = 0
+
+    def __enter__(self):
+        if TRACK_ALLOCATIONS:
+            self._memory = tracemalloc.get_traced_memory()[0]
+            tracemalloc.reset_peak()
+        self._stack = _stage_stack()
+        self.depth = len(self._stack)
+        self._stack.append(self)
+        # Dicatat di trace saat mulai, agar urutannya mengikuti urutan eksekusi (stage induk sebelum anaknya)
+        trace = getattr(_local, "trace", None)
+        if trace is not None:
+            trace.stages.append(self)
+        self._start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.seconds = time.perf_counter() - self._start
+        self._stack.pop()
+        if TRACK_ALLOCATIONS:
+            # Peak di atas memori awal stage; reset_peak di stage bersarang dikompensasi lewat _peak,
+            # yang diteruskan ke stage induknya
+            peak = max(self._peak, tracemalloc.get_traced_memory()[1])
+            self.alloc_bytes = max(0, peak - self._memory)
+            if self._stack:
+                self._stack[-1]._peak = max(self._stack[-1]._peak, peak)
+        metrics.record(self)
+        return False
+
+    def as_dict(self):
+        return {"stage": self.name, "depth": self.depth, "ms": round(self.seconds * 1e3, 3), "rows_in": self.rows_in,
+                "rows_out": self.rows_out, "alloc_bytes": self.alloc_bytes}
+
+# One traced unit of work (rerun / request) with the stages that ran inside it on this thread
+class Trace:
+    def __init__(self, name, **attributes):
+        self.name = name
+        self.attributes = attributes
+        self.stages = []
+        self.seconds = 0.0
+
+    def __enter__(self):
+        self._previous = getattr(_local, "trace", None)
+        _local.trace = self
+        self._start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.seconds = time.perf_counter() - self._start
+        _local.trace = self._previous
+        metrics.record_trace(self)
+        if LOG_TRACES:
+            sys.stderr.write(json.dumps(self.as_dict(), ensure_ascii=False, default=str) + "\n")
+        return False
+
+    # Function to add attributes that are only known at the end (status, ...)
+    def annotate(self, **attributes):
+        self.attributes.update(attributes)
+
+    def as_dict(self):
+        return {"event": "trace", "name": self.name, "ms": round(self.seconds * 1e3, 3), **self.attributes,
+                "stages": [stage.as_dict() for stage in self.stages]}
+
+# No-op stand-in for Stage and Trace while instrumentation is disabled
+class _Noop:
+    name = None
+    stages = ()
+    seconds = 0.0
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        return False
+
+    def annotate(self, **attributes):
+        pass
+
+    # Atribut yang diisi pemanggil (rows_out, ...) dibuang
+    def __setattr__(self, name, value):
+        pass
+
+_noop = _Noop()
+
+# Function to get this thread's stack of open stages
+def _stage_stack():
+    stack = getattr(_local, "stages", None)
+    if stack is None:
+        stack = _local.stages = []
+    return stack
+
+# Function to time one stage: with stage("filter", rows_in=n) as s: ...; s.rows_out = m
+def stage(name, rows_in=None):
+    if not ENABLED:
+        return _noop
+    return Stage(name, rows_in)
+
+# Function to trace one rerun/request: with trace("request", path="/recommendations") as t: ...
+def trace(name, **attributes):
+    if not ENABLED:
+        return _noop
+    return Trace(name, **attributes)
+
+# Function to start a top-level trace that is finished later with finish_trace() (untuk skrip
+# Streamlit, yang tidak bisa dibungkus satu blok with). Trace yang belum selesai di thread ini
+# (rerun sebelumnya dihentikan di tengah jalan) dibuang
+def begin_trace(name, **attributes):
+    if not ENABLED:
+        return _noop
+    _local.trace = None
+    _local.stages = []
+    current = Trace(name, **attributes)
+    current.__enter__()
+    return current
+
+# Function to finish a trace started with begin_trace; returns the trace
+def finish_trace(current):
+    current.__exit__(None, None, None)
+    return current
+
+# Process-wide per-stage aggregates: jumlah, durasi (histogram), baris masuk/keluar, alokasi
+class Metrics:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.stages = {}
+        self.traces = {}
+
+    # Function to add one finished stage to the aggregates
+    def record(self, stage):
+        with self._lock:
+            entry = self.stages.get(stage.name)
+            if entry is None:
+                entry = self.stages[stage.name] = {
+                    "count": 0, "seconds": 0.0, "max_seconds": 0.0, "rows_in": 0, "rows_out": 0,
+                    "alloc_bytes": 0, "buckets": [0] * len(BUCKETS),
+                }
+            _observe(entry, stage.seconds)
+            entry["rows_in"] += stage.rows_in or 0
+            entry["rows_out"] += stage.rows_out or 0
+            entry["alloc_bytes"] += stage.alloc_bytes or 0
+
+    # Function to add one finished trace (durasi total per nama trace)
+    def record_trace(self, trace):
+        with self._lock:
+            entry = self.traces.get(trace.name)
+            if entry is None:
+                entry = self.traces[trace.name] = {"count": 0, "seconds": 0.0, "max_seconds": 0.0, "buckets": [0] * len(BUCKETS)}
+            _observe(entry, trace.seconds)
+
+    # Function to get a copy of the aggregates with the mean duration per stage
+    def stats(self):
+        with self._lock:
+            stages = {name: _summary(entry) for name, entry in self.stages.items()}
+            traces = {name: _summary(entry) for name, entry in self.traces.items()}
+        return {"enabled": ENABLED, "track_allocations": TRACK_ALLOCATIONS, "stages": stages, "traces": traces}
+
+    def clear(self):
+        with self._lock:
+            self.stages.clear()
+            self.traces.clear()
+
+# Function to add one duration to an aggregate entry
+def _observe(entry, seconds):
+    entry["count"] += 1
+    entry["seconds"] += seconds
+    entry["max_seconds"] = max(entry["max_seconds"], seconds)
+    for number, bound in enumerate(BUCKETS):
+        if seconds <= bound:
+            entry["buckets"][number] += 1
+            break
+
+# Function to summarize one aggregate entry (tanpa bucket histogram)
+def _summary(entry):
+    summary = {key: value for key, value in entry.items() if key != "buckets"}
+    summary["mean_ms"] = entry["seconds"] / entry["count"] * 1e3 if entry["count"] else 0.0
+    return summary
+
+# Function to render the aggregates in the Prometheus text exposition format
+# gauges: dict bersarang berisi angka lain (cache, coalescing, pruning), diratakan menjadi
+# moodrasa_<bagian>_<nama>; nilai yang bukan angka dilewati
+def prometheus_text(gauges=None):
+    with metrics._lock:
+        stages = {name: dict(entry, buckets=list(entry["buckets"])) for name, entry in metrics.stages.items()}
+        traces = {name: dict(entry, buckets=list(entry["buckets"])) for name, entry in metrics.traces.items()}
+
+    lines = []
+    for metric, label, entries in (("moodrasa_stage_seconds", "stage", stages), ("moodrasa_trace_seconds", "trace", traces)):
+        lines.append(f"# TYPE {metric} histogram")
+        for name, entry in sorted(entries.items()):
+            labels = f'{label}="{_escape(name)}"'
+            cumulative = 0
+            for bound, count in zip(BUCKETS, entry["buckets"]):
+                cumulative += count
+                lines.append(f'{metric}_bucket{{{labels},le="{bound}"}} {cumulative}')
+            lines.append(f'{metric}_bucket{{{labels},le="+Inf"}} {entry["count"]}')
+            lines.append(f"{metric}_sum{{{labels}}} {entry['seconds']:.9f}")
+            lines.append(f"{metric}_count{{{labels}}} {entry['count']}")
+
+    for key, metric in (("rows_in", "moodrasa_stage_rows_in_total"), ("rows_out", "moodrasa_stage_rows_out_total"),
+                        ("alloc_bytes", "moodrasa_stage_alloc_bytes_total")):
+        lines.append(f"# TYPE {metric} counter")
+        for name, entry in sorted(stages.items()):
+            lines.append(f'{metric}{{stage="{_escape(name)}"}} {entry[key]}')
+
+    for name, value in _flatten(gauges or {}, "moodrasa"):
+        lines.append(f"# TYPE {name} gauge")
+        lines.append(f"{name} {value}")
+    return "\n".join(lines) + "\n"
+
+# Function to flatten nested stats into (metric name, number) pairs
+def _flatten(values, prefix):
+    for key, value in values.items():
+        name = f"{prefix}_{key}"
+        if isinstance(value, dict):
+            yield from _flatten(value, name)
+        elif isinstance(value, (bool, int, float)):
+            yield name, float(value)
+
+# Function to escape a Prometheus label value
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+# Function to get the wall-clock time the process started (detik sejak epoch)
+# Di Linux diambil dari /proc (termasuk waktu import interpreter dan library), selain itu
+# saat modul ini pertama diimpor
+def _process_start():
+    try:
+        with open("/proc/self/stat") as f:
+            started_ticks = int(f.read().rsplit(")", 1)[1].split()[19])
+        with open("/proc/uptime") as f:
+            uptime = float(f.read().split()[0])
+        return time.time() - (uptime - started_ticks / os.sysconf("SC_CLK_TCK"))
+    except (OSError, ValueError, IndexError):
+        return time.time()
+
+PROCESS_START = _process_start()
+
+# Startup milestones: detik sejak awal proses saat setiap event pertama kali terjadi
+# (selalu dicatat, terlepas dari MOODRASA_INSTRUMENT, karena hanya sekali per proses)
+startup_marks = {}
+
+# Function to record a startup milestone (catalogue_loaded, listening, first_response, first_render)
+def mark_startup(event):
+    if event not in startup_marks:
+        startup_marks[event] = time.time() - PROCESS_START
+    return startup_marks[event]
+
+# Function to report the startup milestones and whether the first response met the target
+def startup_stats():
+    first = startup_marks.get("first_response", startup_marks.get("first_render"))
+    return {
+        **{f"{event}_seconds": seconds for event, seconds in startup_marks.items()},
+        "target_seconds": STARTUP_TARGET_SECONDS,
+        "within_target": None if first is None else first <= STARTUP_TARGET_SECONDS,
+    }
+
+# Process-wide stage aggregates
+metrics = Metrics()
+
+# Alokasi hanya bisa diukur bila tracemalloc sudah berjalan sejak awal proses
+if TRACK_ALLOCATIONS and not tracemalloc.is_tracing():
+    tracemalloc.start()
@@ -0,0 +1,244 @@
+import argparse
+import io
+import os
+from itertools import repeat
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from catalogue import CATEGORICAL_COLUMNS
+from catalogue_store import write_catalogue_chunks
+from food_data import DATA_PATH, default_weights
+from wp_engine import CRITERIA, criteria_stats, merge_criteria_stats
+
+# Path of the raw export (sebelum dibersihkan)
+RAW_PATH = "MoodRasaDataFleksibel.csv"
+
+# Kolom numerik yang nilai kosongnya diisi dengan rata-rata kolom
+IMPUTE_COLUMNS = ['Rating', 'Waktu_Persiapan', 'Popularitas', 'Ketersediaan']
+
+# Jumlah baris per chunk; memori yang dipakai sebanding dengan ini, bukan dengan ukuran file
+CHUNK_ROWS = 100_000
+
+# Read-only file object over the byte range [start, stop) of a file
+class _ByteRange(io.RawIOBase):
+    def __init__(self, path, start, stop):
+        self._file = open(path, "rb")
+        self._file.seek(start)
+        self._left = stop - start
+
+    def readable(self):
+        return True
+
+    def readinto(self, buffer):
+        size = min(len(buffer), self._left)
+        if size <= 0:
+            return 0
+        read = self._file.readinto(memoryview(buffer)[:size])
+        self._left -= read
+        return read
+
+    def close(self):
+        self._file.close()
+        super().close()
+
+# Function to read the column names from the CSV header
+def read_header(path):
+    return list(pd.read_csv(path, nrows=0).columns)
+
+# Function to split a CSV (after its header) into byte ranges that start and end on line breaks
+# Catatan: mengasumsikan tidak ada baris baru di dalam field yang di-quote
+def byte_ranges(path, shards):
+    size = os.path.getsize(path)
+    with open(path, "rb") as f:
+        f.readline()
+        header_end = f.tell()
+        bounds = [header_end]
+        for i in range(1, shards):
+            f.seek(header_end + (size - header_end) * i // shards)
+            f.readline()
+            bounds.append(max(f.tell(), bounds[-1]))
+    bounds.append(size)
+    return [(start, stop) for start, stop in zip(bounds[:-1], bounds[1:]) if start < stop]
+
+# Function to read one byte range of a CSV as fixed-size chunks
+def read_range_chunks(path, byte_range, columns, chunksize=CHUNK_ROWS):
+    start, stop = byte_range
+    return pd.read_csv(io.BufferedReader(_ByteRange(path, start, stop)), header=None, names=columns, chunksize=chunksize)
+
+# Function to scan one shard (pass 1): running sums/counts for the column means,
+# plus the columns that are float anywhere in the shard
+def _scan_shard(byte_range, path, columns, chunksize):
+    sums = dict.fromkeys(IMPUTE_COLUMNS, 0.0)
+    counts = dict.fromkeys(IMPUTE_COLUMNS, 0)
+    float_columns = set(IMPUTE_COLUMNS)
+    rows = 0
+    for chunk in read_range_chunks(path, byte_range, columns, chunksize):
+        rows += len(chunk)
+        for column in IMPUTE_COLUMNS:
+            values = chunk[column].to_numpy(dtype=np.float64, na_value=np.nan)
+            present = ~np.isnan(values)
+            sums[column] += values[present].sum()
+            counts[column] += int(present.sum())
+        float_columns.update(column for column in chunk.columns if pd.api.types.is_float_dtype(chunk[column]))
+    return {'rows': rows, 'sums': sums, 'counts': counts, 'float_columns': float_columns}
+
+# Function to merge the pass-1 scans of all shards into global means
+# Kolom yang float di salah satu shard ditulis sebagai float di semua shard, agar hasilnya
+# sama dengan membaca seluruh file sekaligus seperti di notebook
+def _merge_scans(scans):
+    means = {}
+    for column in IMPUTE_COLUMNS:
+        count = sum(scan['counts'][column] for scan in scans)
+        means[column] = sum(scan['sums'][column] for scan in scans) / count if count else np.nan
+    return {
+        'rows': sum(scan['rows'] for scan in scans),
+        'means': means,
+        'float_columns': set().union(*(scan['float_columns'] for scan in scans)),
+    }
+
+# Function to clean one chunk: fill the impute columns with the global means, then drop
+# rows that still contain NaN. Returns (cleaned chunk, imputed values per column, imputed rows)
+def clean_chunk(chunk, means, float_columns=()):
+    chunk = chunk.astype({column: np.float64 for column in float_columns if column in chunk})
+    missing = chunk[IMPUTE_COLUMNS].isna()
+    chunk = chunk.fillna(means)
+    cleaned = chunk.dropna()
+
+    imputed_values = missing.sum().to_dict()
+    imputed_rows = int(missing.any(axis=1)[cleaned.index].sum())
+    return cleaned, imputed_values, imputed_rows
+
+# Function to clean one shard (pass 2) into a headerless part file
+# Statistik kriteria (min/max/sum/count) dihitung dari baris yang sudah bersih; dengan
+# summarize juga kamus kolom kategorikal, untuk menulis catalogue store tanpa scan tambahan
+def _clean_shard(byte_range, part_path, path, columns, chunksize, means, float_columns, summarize=False):
+    report = {
+        'rows_read': 0,
+        'rows_imputed': 0,
+        'values_imputed': dict.fromkeys(IMPUTE_COLUMNS, 0),
+        'rows_dropped': 0,
+        'rows_written': 0,
+    }
+    stats = []
+    dictionaries = {}
+    with open(part_path, "w", encoding="utf-8", newline="") as f:
+        for chunk in read_range_chunks(path, byte_range, columns, chunksize):
+            cleaned, imputed_values, imputed_rows = clean_chunk(chunk, means, float_columns)
+            cleaned.to_csv(f, index=False, header=False)
+
+            report['rows_read'] += len(chunk)
+            report['rows_imputed'] += imputed_rows
+            for column, count in imputed_values.items():
+                report['values_imputed'][column] += int(count)
+            report['rows_dropped'] += len(chunk) - len(cleaned)
+            report['rows_written'] += len(cleaned)
+            if all(column in cleaned for column in CRITERIA):
+                stats.append(criteria_stats(cleaned))
+            if summarize:
+                for column in CATEGORICAL_COLUMNS:
+                    if column in cleaned:
+                        dictionaries.setdefault(column, set()).update(cleaned[column].dropna().unique().tolist())
+    return report, stats, dictionaries
+
+# Function to run function(shard, *args) over all shards, in a process pool when workers > 1
+# Setiap argumen lain berupa iterable dengan satu nilai per shard
+def _map_shards(function, workers, shards, *args):
+    if workers <= 1 or len(shards) <= 1:
+        return list(map(function, shards, *args))
+    with ProcessPoolExecutor(max_workers=min(workers, len(shards))) as pool:
+        return list(pool.map(function, shards, *args))
+
+# Function to clean a raw CSV in two streaming passes and write the cleaned CSV
+# Dengan workers > 1 file dibagi menjadi byte range yang diproses paralel: pass 1 menghitung
+# sum/count per shard, rata-rata global digabung, lalu pass 2 membersihkan tiap shard ke file
+# part dan menghitung statistik kriteria per shard. Part disambung berurutan, dan statistik
+# digabung menjadi min/max global untuk normalisasi (build_criteria_matrix(data, stats)).
+# Output ditulis ke file sementara lalu diganti secara atomik, sehingga aplikasi tidak
+# pernah membaca file yang setengah jadi.
+# Dengan store_path, pass terakhir menulis CSV bersih ke catalogue store yang dinormalisasi dengan
+# statistik gabungan tersebut (WP_Score dengan bobot default), tanpa menghitung ulang statistiknya
+def preprocess(raw_path=RAW_PATH, output_path=DATA_PATH, chunksize=CHUNK_ROWS, workers=1, store_path=None):
+    columns = read_header(raw_path)
+    shards = byte_ranges(raw_path, max(1, workers))
+
+    scan = _merge_scans(_map_shards(_scan_shard, workers, shards, repeat(raw_path), repeat(columns), repeat(chunksize)))
+
+    part_paths = [f"{output_path}.part{i}" for i in range(len(shards))]
+    results = _map_shards(
+        _clean_shard, workers, shards, part_paths, repeat(raw_path), repeat(columns), repeat(chunksize),
+        repeat(scan['means']), repeat(scan['float_columns']), repeat(store_path is not None),
+    )
+
+    report = {
+        'rows_read': 0,
+        'rows_imputed': 0,
+        'values_imputed': dict.fromkeys(IMPUTE_COLUMNS, 0),
+        'rows_dropped': 0,
+        'rows_written': 0,
+        'means': scan['means'],
+        'store': None,
+    }
+    stats = []
+    dictionaries = {}
+    for shard_report, shard_stats, shard_dictionaries in results:
+        for key in ('rows_read', 'rows_imputed', 'rows_dropped', 'rows_written'):
+            report[key] += shard_report[key]
+        for column, count in shard_report['values_imputed'].items():
+            report['values_imputed'][column] += count
+        stats.extend(shard_stats)
+        for column, texts in shard_dictionaries.items():
+            dictionaries.setdefault(column, set()).update(texts)
+    report['criteria_stats'] = merge_criteria_stats(stats) if stats else None
+
+    # Sambung header + semua part sesuai urutan shard
+    temp_path = output_path + ".tmp"
+    with open(temp_path, "wb") as f:
+        f.write(pd.DataFrame(columns=columns).to_csv(index=False).encode("utf-8"))
+        for part_path in part_paths:
+            with open(part_path, "rb") as part:
+                while block := part.read(1 << 20):
+                    f.write(block)
+            os.remove(part_path)
+    os.replace(temp_path, output_path)
+
+    # Tanpa baris bersih (atau tanpa kolom kriteria) tidak ada store yang bisa ditulis
+    if store_path is not None and report['rows_written'] and report['criteria_stats']:
+        summary = {'rows': report['rows_written'], 'criteria_stats': report['criteria_stats'], 'dictionaries': dictionaries}
+        float_dtypes = {column: np.float64 for column in scan['float_columns'] if column in columns}
+        write_catalogue_chunks(lambda: pd.read_csv(output_path, chunksize=chunksize, dtype=float_dtypes),
+                               store_path, default_weights, summary)
+        report['store'] = store_path
+    return report
+
+# Function to format the preprocessing report: one summary line, plus one line per criterion
+# Mean kriteria ditulis n/a bila tidak ada nilai (misalnya semua baris terbuang)
+def format_report(report):
+    imputed = ", ".join(f"{column}={count}" for column, count in report['values_imputed'].items())
+    lines = [
+        f"rows read: {report['rows_read']}, imputed: {report['rows_imputed']} ({imputed}), "
+        f"dropped: {report['rows_dropped']}, written: {report['rows_written']}"
+    ]
+    for column, stats in (report['criteria_stats'] or {}).items():
+        mean = f"{stats['sum'] / stats['count']:.4f}" if stats['count'] else "n/a"
+        lines.append(f"   {column}: min={stats['min']}, max={stats['max']}, mean={mean}")
+    return "\n".join(lines)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Clean the raw MoodRasa export in bounded memory")
+    parser.add_argument("raw_path", nargs="?", default=RAW_PATH)
+    parser.add_argument("output_path", nargs="?", default=DATA_PATH)
+    parser.add_argument("--chunksize", type=int, default=CHUNK_ROWS, help="rows per chunk")
+    parser.add_argument("--workers", type=int, default=1, help="worker processes (0 = all cores)")
+    parser.add_argument("--store", help="also write the normalized catalogue store to this folder")
+    args = parser.parse_args()
+
+    workers = args.workers or os.cpu_count()
+    report = preprocess(args.raw_path, args.output_path, args.chunksize, workers, args.store)
+    print(f"✅ '{args.raw_path}' dibersihkan ke '{args.output_path}'")
+    print(format_report(report))
+    if report['store']:
+        print(f"✅ Catalogue store ditulis ke '{report['store']}'")
+    elif args.store:
+        print(f"⚠️ Tidak ada baris bersih, catalogue store '{args.store}' tidak ditulis")
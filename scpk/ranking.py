@@ -0,0 +1,64 @@
+import numpy as np
+import pandas as pd
+
+# Sort options dengan kunci pengurutannya: (kolom, ascending)
+SORT_KEYS = {
+    "🌟 Highest Rated": [("Rating", False)],
+    "💰 Lowest Price": [("Harga", True)],
+    "💎 Highest Price": [("Harga", False)],
+    "🔤 A-Z": [("Nama", True)],
+    "🎯 Best WP Score": [("WP_Score", False)],
+    "🎯 Best Match": [("WP_Score", False), ("Rating", False)],
+    # Metode MCDM lain atas matriks kriteria yang sama (lihat scorers.py)
+    "➕ Best SAW Score": [("SAW_Score", False)],
+    "🧭 Best TOPSIS Score": [("TOPSIS_Score", False)],
+}
+
+# Function to get the columns a sort option needs
+def sort_columns(sort_by):
+    return [column for column, _ in SORT_KEYS.get(sort_by, SORT_KEYS["🎯 Best Match"])]
+
+# Function to turn a column into a float key where smaller sorts first
+# NaN selalu ditaruh paling akhir, sama seperti sort_values
+def _ascending_key(column, ascending):
+    if not isinstance(column, pd.Series):
+        column = pd.Series(column, copy=False)
+    if pd.api.types.is_numeric_dtype(column):
+        key = column.to_numpy(dtype=np.float64, na_value=np.nan)
+        if not ascending:
+            key = -key
+        return np.where(np.isnan(key), np.inf, key)
+
+    codes, uniques = pd.factorize(column, sort=True)
+    key = codes.astype(np.float64)
+    if not ascending:
+        key = -key
+    return np.where(codes < 0, np.inf, key)
+
+# Function to stable-sort a set of row positions by the given keys
+def _lexsort(keys, positions):
+    # np.lexsort memakai kunci terakhir sebagai kunci utama, posisi asli sebagai pemecah seri
+    return positions[np.lexsort([positions] + [key[positions] for key in reversed(keys)])]
+
+# Function to get the row order for a sort option
+# data boleh berupa DataFrame atau dict kolom -> Series/array (cukup kolom yang diurutkan).
+# Dengan top_k, hanya top_k baris pertama yang diurutkan penuh (argpartition),
+# sisanya mengikuti urutan asli. Tanpa top_k dilakukan full stable sort.
+def sort_order(data, sort_by, top_k=None):
+    keys = [_ascending_key(data[column], ascending) for column, ascending in SORT_KEYS.get(sort_by, SORT_KEYS["🎯 Best Match"])]
+    n = len(keys[0])
+
+    if top_k is None or top_k >= n:
+        return _lexsort(keys, np.arange(n))
+    if top_k <= 0:
+        return np.arange(n)
+
+    # Ambil nilai ke-k pada kunci utama, lalu kandidat = semua baris yang lebih baik atau seri
+    primary = keys[0]
+    threshold = np.partition(primary, top_k - 1)[top_k - 1]
+    candidates = np.flatnonzero(primary <= threshold)
+    top = _lexsort(keys, candidates)[:top_k]
+
+    rest = np.ones(n, dtype=bool)
+    rest[top] = False
+    return np.concatenate([top, np.flatnonzero(rest)])
@@ -0,0 +1,294 @@
+import threading
+
+import numpy as np
+import pandas as pd
+
+from cards import PAGE_SIZE, page_bounds, page_count
+from food_data import default_weights
+from indexes import CATEGORY_COLUMNS, match_filters
+from instrumentation import stage
+from ranking import SORT_KEYS, sort_columns, sort_order
+from result_cache import filter_cache, filter_key
+from scorers import SCORE_COLUMNS, SCORERS, scorer_for, shortlist_rows
+from single_flight import SingleFlight
+from wp_engine import CRITERIA, score_wp
+
+# Filter value that disables a categorical filter
+ALL = "Semua"
+
+# Budget options of the sidebar: (min, max) harga dalam Rupiah
+PRICE_RANGES = {
+    "All Budgets": (0, 100000),
+    "Budget Friendly (< 25k)": (0, 25000),
+    "Mid Range (25k - 40k)": (25000, 40000),
+    "Premium (40k - 60k)": (40000, 60000),
+    "Luxury (> 60k)": (60000, 100000)
+}
+
+# Minimum rating options of the sidebar
+RATING_OPTIONS = {
+    "All Ratings": 0.0,
+    "Good (≥ 4.0)": 4.0,
+    "Excellent (≥ 4.5)": 4.5,
+    "Outstanding (≥ 4.8)": 4.8
+}
+
+DEFAULT_SORT = "🎯 Best Match"
+
+# Nama pendek sort option untuk klien API (opsi lengkap dengan emoji juga diterima)
+SORT_ALIASES = {
+    "rating": "🌟 Highest Rated",
+    "price_asc": "💰 Lowest Price",
+    "price_desc": "💎 Highest Price",
+    "name": "🔤 A-Z",
+    "wp": "🎯 Best WP Score",
+    "best": "🎯 Best Match",
+    "saw": "➕ Best SAW Score",
+    "topsis": "🧭 Best TOPSIS Score",
+}
+
+SEARCH_MODES = ("substring", "prefix", "fuzzy")
+
+# Sort dengan kunci utama WP_Score memakai block-max pruning mulai dari jumlah baris cocok ini
+# (di bawahnya full sort sudah cukup murah)
+PRUNE_MIN_ROWS = 50_000
+
+# Penghitung block-max pruning: berapa baris yang cocok dan berapa yang benar-benar dinilai
+# Diperbarui dari banyak thread (executor API, sesi Streamlit), jadi hanya diubah/dibaca di bawah _pruning_lock
+pruning_stats = {"queries": 0, "rows_matched": 0, "rows_scored": 0, "blocks": 0, "blocks_scored": 0}
+_pruning_lock = threading.Lock()
+
+# Function to get a consistent copy of the pruning counters
+def pruning_snapshot():
+    with _pruning_lock:
+        return dict(pruning_stats)
+
+# Query identik yang datang bersamaan (cache miss) menunggu satu komputasi yang sedang berjalan
+query_flight = SingleFlight()
+
+# Function to normalize raw slider weights to sum 1 (total 0 -> default weights)
+def normalize_weights(weights):
+    total = sum(weights[c] for c in CRITERIA)
+    if total > 0:
+        return {c: weights[c] / total for c in CRITERIA}
+    return default_weights
+
+# Function to filter, score and sort a catalogue, returning (row positions, scores)
+# Dipakai bersama oleh aplikasi Streamlit dan API HTTP. custom_weights yang sama dengan
+# bobot default memakai kolom WP_Score yang sudah dihitung. Hasil di-cache per versi catalogue.
+# Skor berasal dari metode sort option (WP, SAW atau TOPSIS) dan hanya untuk top_k posisi
+# pertama (semua posisi bila top_k None).
+# max_error > 0 mengizinkan top-K WP yang mendekati (lihat BlockMaxIndex.top_k);
+# shortlist = N: metode mahal (TOPSIS) hanya menilai N kandidat terbaik menurut pre-scorer murahnya (SAW)
+def filter_catalogue(catalogue, category=ALL, location=ALL, meal_time=ALL, price_range=PRICE_RANGES["All Budgets"],
+                     min_rating=0.0, search_text="", sort_by=DEFAULT_SORT, custom_weights=None,
+                     search_mode="substring", top_k=None, max_error=0.0, shortlist=None):
+    if not custom_weights or custom_weights == default_weights:
+        custom_weights = None
+
+    # Reuse cached row positions for the same filter/sort/weight combination
+    cache_key = filter_key(
+        catalogue.version, category, location, meal_time,
+        price_range, min_rating, search_text, sort_by,
+        custom_weights, search_mode, max_error, shortlist
+    )
+    with stage("cache_lookup") as timing:
+        positions = filter_cache.get(cache_key, top_k)
+        timing.rows_out = None if positions is None else len(positions)
+
+    if positions is None:
+        # Single-flight per (key, top_k): sesi lain yang meminta hal yang sama menunggu hasil ini
+        def compute():
+            positions = _filter_and_sort(
+                catalogue, category, location, meal_time, price_range, min_rating,
+                search_text, sort_by, custom_weights, search_mode, top_k, max_error, shortlist
+            )
+            filter_cache.put(cache_key, positions, top_k if top_k is not None and top_k < len(positions) else None)
+            return positions
+        positions = query_flight.do((cache_key, top_k), compute)
+
+    # Return index arrays instead of a DataFrame copy: row positions + the scores of the rows shown
+    head = positions if top_k is None else positions[:top_k]
+    return positions, row_scores(catalogue, head, custom_weights, sort_by)
+
+# Function to score the given rows with the method of a sort option (WP untuk sort tanpa kolom skor)
+def row_scores(catalogue, positions, custom_weights=None, sort_by=DEFAULT_SORT):
+    if not custom_weights or custom_weights == default_weights:
+        custom_weights = None
+    scorer = scorer_for(sort_columns(sort_by))
+    if scorer.name == "WP":
+        return wp_scores(catalogue, positions, custom_weights)
+    with stage("rescore", rows_in=len(positions)) as timing:
+        scores = scorer.score(catalogue.wp_matrix[positions], custom_weights or default_weights, catalogue.criteria_bounds())
+        timing.rows_out = len(scores)
+    return scores
+
+# Function to get the name and score column of the method a sort option ranks by
+def score_method(sort_by):
+    scorer = scorer_for(sort_columns(sort_by))
+    return scorer.name, scorer.column
+
+# Function to get the WP Score of the given rows (custom weights are rescored from the matrix)
+def wp_scores(catalogue, positions, custom_weights=None):
+    with stage("rescore" if custom_weights else "score_lookup", rows_in=len(positions)) as timing:
+        if custom_weights:
+            scores = score_wp(catalogue.wp_matrix[positions], custom_weights)
+        else:
+            scores = catalogue.data["WP_Score"].to_numpy()[positions]
+        timing.rows_out = len(scores)
+    return scores
+
+# Function to filter and sort the catalogue, returning row positions into its data
+def _filter_and_sort(catalogue, category, location, meal_time, price_range, min_rating,
+                     search_text, sort_by, custom_weights, search_mode, top_k, max_error=0.0, shortlist=None):
+    data = catalogue.data
+
+    # Categorical filters via the inverted indexes (hanya baris yang cocok yang disentuh)
+    category_indexes = catalogue.category_indexes
+    filters = []
+    if category != ALL:
+        filters.append((category_indexes["Kategori"], [category]))
+
+    if location != ALL:
+        filters.append((category_indexes["Lokasi"], [location]))
+
+    if meal_time != ALL:
+        filters.append((category_indexes["Waktu_Makan"], [meal_time, ALL]))
+
+    # Apply price range (sorted range index, O(log n + k))
+    filters.append((catalogue.range_indexes["Harga"], price_range))
+
+    # Apply rating filter
+    if min_rating > 0:
+        filters.append((catalogue.range_indexes["Rating"], (min_rating, np.inf)))
+
+    # Apply search filter (n-gram / token index over Nama and Deskripsi)
+    if search_text:
+        filters.append((catalogue.search_index(), (search_text, search_mode)))
+
+    with stage("filter", rows_in=len(data)) as timing:
+        positions = match_filters(filters, len(data))
+        timing.rows_out = len(positions)
+
+    # Best WP Score / Best Match: hanya blok Kategori x Lokasi yang masih bisa masuk top_k yang dinilai
+    if top_k is not None and top_k < len(positions) and len(positions) >= PRUNE_MIN_ROWS \
+            and sort_columns(sort_by)[0] == "WP_Score":
+        return _pruned_top_k(catalogue, positions, category, location, sort_by, custom_weights, top_k, max_error)
+
+    # Metode mahal dengan shortlist: hanya kandidat terbaik menurut pre-scorer yang dinilai dan diurutkan
+    scorer = scorer_for(sort_columns(sort_by))
+    candidates = positions
+    if shortlist is not None and top_k is not None:
+        with stage("shortlist", rows_in=len(positions)) as timing:
+            candidates = shortlist_rows(scorer, catalogue.wp_matrix, positions, custom_weights or default_weights,
+                                        catalogue.criteria_bounds(), max(shortlist, top_k))
+            timing.rows_out = len(candidates)
+
+    # Apply sorting on just the sort columns of the matching rows (top_k: only the first screen is fully ordered)
+    sort_data = {column: data[column].iloc[candidates] for column in sort_columns(sort_by) if column not in SCORE_COLUMNS}
+    sort_data[scorer.column] = row_scores(catalogue, candidates, custom_weights, sort_by)
+    with stage("sort", rows_in=len(candidates)) as timing:
+        ordered = candidates[sort_order(sort_data, sort_by, top_k)]
+        timing.rows_out = len(ordered) if top_k is None else min(top_k, len(ordered))
+    if candidates is positions:
+        return ordered
+
+    # Urutan sama dengan _pruned_top_k: top_k baris terurut, lalu sisa baris cocok dalam urutan asli
+    top = ordered[:top_k]
+    is_top = np.zeros(len(data), dtype=bool)
+    is_top[top] = True
+    return np.concatenate([top, positions[~is_top[positions]]]).astype(positions.dtype, copy=False)
+
+# Function to get the matching positions with the top_k WP rows first, via block-max pruning
+# Urutannya sama dengan sort_order(top_k): top_k baris terurut, lalu sisanya dalam urutan asli
+def _pruned_top_k(catalogue, positions, category, location, sort_by, custom_weights, top_k, max_error):
+    n_rows = len(catalogue.data)
+    index = catalogue.block_index()
+    blocks = index.select_blocks(None if category == ALL else category, None if location == ALL else location)
+
+    matched = None
+    if len(positions) < n_rows:
+        matched = np.zeros(n_rows, dtype=bool)
+        matched[positions] = True
+    with stage("prune", rows_in=len(positions)) as timing:
+        top, stats = index.top_k(top_k, catalogue.data, sort_by, custom_weights, blocks, matched, max_error)
+        timing.rows_out = len(top)
+
+    with _pruning_lock:
+        pruning_stats["queries"] += 1
+        pruning_stats["rows_matched"] += len(positions)
+        for key in ("rows_scored", "blocks", "blocks_scored"):
+            pruning_stats[key] += stats[key]
+
+    is_top = np.zeros(n_rows, dtype=bool)
+    is_top[top] = True
+    return np.concatenate([top, positions[~is_top[positions]]]).astype(positions.dtype, copy=False)
+
+# Function to turn the given catalogue rows into JSON-ready dicts
+# Dibangun per kolom langsung dari array di balik Series (tanpa membuat Series/DataFrame baru)
+# dan hanya untuk baris yang diminta; float32 dibulatkan agar tampil ringkas.
+# scores mengisi score_column (WP_Score, atau kolom baru seperti TOPSIS_Score)
+def page_records(data, positions, scores=None, score_column="WP_Score"):
+    with stage("page_records", rows_in=len(positions)) as timing:
+        records = _page_records(data, positions, scores, score_column)
+        timing.rows_out = len(records)
+    return records
+
+def _page_records(data, positions, scores=None, score_column="WP_Score"):
+    columns = {}
+    names = list(data.columns)
+    if scores is not None and score_column not in names:
+        names.append(score_column)
+    for column in names:
+        if column == score_column and scores is not None:
+            values = np.asarray(scores)
+        else:
+            values = data[column].array
+            if isinstance(values, pd.Categorical):
+                # Kode -1 (nilai kosong) menunjuk ke None yang ditambahkan di akhir
+                values = np.append(values.categories.to_numpy(dtype=object), None)[values.codes[positions]]
+            else:
+                values = np.asarray(values.take(positions))
+        if values.dtype.kind == 'f':
+            columns[column] = np.round(np.asarray(values, dtype=np.float64), 2).tolist()
+        else:
+            columns[column] = values.tolist()
+    return [dict(zip(columns, row)) for row in zip(*columns.values())]
+
+# Function to get one page of recommendations as a JSON-ready dict
+def recommend(catalogue, page=1, page_size=PAGE_SIZE, **filters):
+    positions, scores = filter_catalogue(catalogue, top_k=page * page_size, **filters)
+    method, score_column = score_method(filters.get("sort_by", DEFAULT_SORT))
+    total_pages = page_count(len(positions), page_size)
+    page = min(max(1, page), total_pages)
+    start, stop = page_bounds(page, len(positions), page_size)
+    return {
+        "version": catalogue.version,
+        "total": len(positions),
+        "catalogue_size": len(catalogue.data),
+        "page": page,
+        "pages": total_pages,
+        "page_size": page_size,
+        "score_method": method,
+        "results": page_records(catalogue.data, positions[start:stop], scores[start:stop], score_column),
+    }
+
+# Function to list the valid filter values of a catalogue (isi dropdown sidebar)
+def filter_options(catalogue):
+    data = catalogue.data
+    return options_from_values({column: data[column].unique().tolist() for column in CATEGORY_COLUMNS})
+
+# Function to build the filter options from the distinct values of the categorical columns
+def options_from_values(values):
+    return {
+        "categories": [ALL] + sorted(values["Kategori"]),
+        "locations": [ALL] + sorted(values["Lokasi"]),
+        "meal_times": [ALL] + sorted(values["Waktu_Makan"]),
+        "price_ranges": {name: list(bounds) for name, bounds in PRICE_RANGES.items()},
+        "rating_options": RATING_OPTIONS,
+        "sort_options": list(SORT_KEYS),
+        "sort_aliases": SORT_ALIASES,
+        "search_modes": list(SEARCH_MODES),
+        "score_methods": list(SCORERS),
+        "default_weights": default_weights,
+    }
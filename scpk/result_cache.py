@@ -0,0 +1,100 @@
+import os
+import sys
+import threading
+from collections import OrderedDict
+
+import numpy as np
+
+# Default byte budget of the filter-result cache (bisa diubah lewat environment variable)
+DEFAULT_CACHE_BYTES = int(os.environ.get("MOODRASA_RESULT_CACHE_BYTES", 64 * 2**20))
+
+# Function to build the normalized cache key of one filter/sort/weight combination
+# Pencarian tidak peka huruf besar/kecil dan bobot dibulatkan agar variasi float kecil tetap hit
+def filter_key(version, category, location, meal_time, price_range, min_rating,
+               search_text, sort_by, weights=None, search_mode="substring", max_error=0.0, shortlist=None):
+    weights_key = None
+    if weights:
+        weights_key = tuple(sorted((name, round(float(w), 6)) for name, w in weights.items()))
+    return (
+        version, category, location, meal_time,
+        (float(price_range[0]), float(price_range[1])), float(min_rating),
+        (search_text or "").lower(), search_mode, sort_by, weights_key, float(max_error),
+        None if shortlist is None else int(shortlist),
+    )
+
+# LRU cache of filter results, storing row positions instead of DataFrame copies
+class ResultCache:
+    def __init__(self, max_bytes=DEFAULT_CACHE_BYTES):
+        self.max_bytes = max_bytes
+        self._entries = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    # Function to get cached positions; hit hanya jika baris yang sudah terurut cukup untuk top_k
+    def get(self, key, top_k=None):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or not _covers(entry[1], top_k):
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+
+    # Function to store result positions; sorted_rows = None berarti seluruh hasil terurut
+    def put(self, key, positions, sorted_rows=None):
+        positions = _compact(positions)
+        positions.flags.writeable = False
+        size = positions.nbytes + sys.getsizeof(key)
+        if size > self.max_bytes:
+            return
+
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self._bytes -= old[2]
+            self._entries[key] = (positions, sorted_rows, size)
+            self._bytes += size
+
+            while self._bytes > self.max_bytes:
+                _, (_, _, evicted_size) = self._entries.popitem(last=False)
+                self._bytes -= evicted_size
+                self.evictions += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    # Function to report the counters used to size the cache
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_ratio": self.hits / lookups if lookups else 0.0,
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "max_bytes": self.max_bytes,
+            }
+
+# Function to check whether a cached sort prefix can serve a request for top_k rows
+def _covers(sorted_rows, top_k):
+    if sorted_rows is None:
+        return True
+    return top_k is not None and top_k <= sorted_rows
+
+# Function to store positions with the smallest integer dtype that fits
+def _compact(positions):
+    positions = np.asarray(positions)
+    if len(positions) == 0 or positions.max() < 2**31:
+        return positions.astype(np.int32)
+    return positions.astype(np.int64)
+
+# Process-wide filter-result cache shared by all sessions
+filter_cache = ResultCache()
@@ -0,0 +1,102 @@
+import numpy as np
+
+from wp_engine import CRITERIA, score_wp, weight_vector
+
+# Pluggable MCDM scorers over the shared log-normalized criteria matrix (build_criteria_matrix)
+# Matriks itu sudah memuat arah benefit/cost: benefit x / max, cost min / x, lalu di-log.
+# exp(matriks) memberi rating ternormalisasi r di [0, 1] dengan 1 = terbaik untuk setiap kriteria,
+# sehingga SAW dan TOPSIS tidak perlu tahu lagi kriteria mana yang cost (Harga, Waktu_Persiapan).
+# Setiap scorer mengembalikan skor 0-100 (2 desimal) dengan urutan baris yang sama dengan matriks.
+
+# Function to get the criteria bounds of a matrix in log space: (log min, log max) per kriteria
+# Dipakai TOPSIS sebagai solusi anti-ideal dan ideal; NaN diabaikan
+def criteria_bounds(matrix):
+    if len(matrix) == 0:
+        return np.full(len(CRITERIA), np.nan), np.full(len(CRITERIA), np.nan)
+    return np.fmin.reduce(matrix, axis=0), np.fmax.reduce(matrix, axis=0)
+
+# Function to get the same bounds from global criteria stats (shard tanpa seluruh matriks)
+# Dihitung dengan operasi yang sama seperti build_criteria_matrix, sehingga hasilnya identik
+# dengan criteria_bounds atas matriks catalogue penuh
+def bounds_from_stats(stats):
+    low, high = [], []
+    for c in CRITERIA:
+        if not stats[c]['count']:
+            low.append(np.nan)
+            high.append(np.nan)
+            continue
+        with np.errstate(divide='ignore', invalid='ignore'):
+            low.append(np.log(np.float64(stats[c]['min']) / np.float64(stats[c]['max'])))
+            high.append(np.log(np.float64(stats[c]['max']) / np.float64(stats[c]['max'])))
+    return np.array(low), np.array(high)
+
+# Function to split a weight vector into the active criteria (bobot 0 dilewati, x^0 = 1 / 0 * NaN)
+def _active(weights):
+    w = weight_vector(weights)
+    return w != 0, w
+
+# Weighted Product: exp(sum w_j log r_j) = prod r_j^w_j (sama dengan calculate_wp_score)
+class WeightedProduct:
+    name = "WP"
+    column = "WP_Score"
+    shortlist_by = None
+
+    def score(self, matrix, weights, bounds=None):
+        return score_wp(matrix, weights)
+
+# Simple Additive Weighting: sum w_j r_j, skor termurah (satu exp dan satu perkalian matriks)
+class SimpleAdditiveWeighting:
+    name = "SAW"
+    column = "SAW_Score"
+    shortlist_by = None
+
+    def score(self, matrix, weights, bounds=None):
+        active, w = _active(weights)
+        ratings = np.exp(matrix if active.all() else matrix[:, active])
+        return np.round(ratings @ w[active] * 100, 2)
+
+# TOPSIS: kedekatan relatif ke solusi ideal, d- / (d+ + d-) pada rating terbobot w_j r_j
+# Solusi ideal dan anti-ideal diambil dari seluruh catalogue (bounds), bukan dari hasil filter,
+# agar skor tetap sebanding antar filter/halaman dan bisa di-cache seperti skor lain.
+# Lebih mahal dari SAW, sehingga boleh dihitung hanya untuk shortlist hasil SAW (lihat shortlist_rows)
+class Topsis:
+    name = "TOPSIS"
+    column = "TOPSIS_Score"
+    shortlist_by = "SAW"
+
+    def score(self, matrix, weights, bounds):
+        active, w = _active(weights)
+        low, high = bounds
+        weighted = np.exp(matrix[:, active]) * w[active]
+        ideal = np.exp(high[active]) * w[active]
+        anti_ideal = np.exp(low[active]) * w[active]
+
+        to_ideal = np.sqrt(((weighted - ideal) ** 2).sum(axis=1))
+        to_anti_ideal = np.sqrt(((weighted - anti_ideal) ** 2).sum(axis=1))
+        total = to_ideal + to_anti_ideal
+        # Ideal = anti-ideal (semua nilai sama): setiap baris sudah ideal
+        closeness = np.divide(to_anti_ideal, total, out=np.ones_like(total), where=total != 0)
+        return np.round(closeness * 100, 2)
+
+# Registered scorers by method name and by the sort column they fill
+SCORERS = {scorer.name: scorer for scorer in (WeightedProduct(), SimpleAdditiveWeighting(), Topsis())}
+SCORE_COLUMNS = {scorer.column: scorer for scorer in SCORERS.values()}
+
+# Function to get the scorer a sort option ranks by (kolom skor pertama di kunci sort; default WP)
+def scorer_for(columns):
+    for column in columns:
+        if column in SCORE_COLUMNS:
+            return SCORE_COLUMNS[column]
+    return SCORERS["WP"]
+
+# Function to keep the best `size` rows according to the scorer's cheap pre-scorer
+# Returns the kept positions in their original order (semua baris bila tidak ada pre-scorer
+# atau size tidak lebih kecil dari jumlah baris). Hasilnya pendekatan: baris di luar shortlist
+# tidak dinilai oleh scorer yang mahal
+def shortlist_rows(scorer, matrix, positions, weights, bounds, size):
+    if scorer.shortlist_by is None or size is None or size >= len(positions):
+        return positions
+    cheap = SCORERS[scorer.shortlist_by].score(matrix[positions], weights, bounds)
+    cheap = np.where(np.isnan(cheap), -np.inf, cheap)
+    keep = np.argpartition(-cheap, size - 1)[:size]
+    return positions[np.sort(keep)]
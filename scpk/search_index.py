@@ -0,0 +1,201 @@
+import bisect
+import re
+from collections import defaultdict
+from functools import lru_cache
+
+import numpy as np
+import pandas as pd
+
+# Kolom yang diindeks untuk pencarian teks
+SEARCH_COLUMNS = ['Nama', 'Deskripsi']
+
+# Panjang n-gram untuk pencarian substring
+NGRAM = 3
+
+_token_pattern = re.compile(r"\w+")
+
+# Function to get the distinct n-grams of a (case-folded) text
+def _ngrams(text, n=NGRAM):
+    return {text[i:i + n] for i in range(len(text) - n + 1)}
+
+# Function to compute the edit distance (Levenshtein + transposisi huruf bersebelahan),
+# stopping early once it exceeds limit
+@lru_cache(maxsize=65536)
+def edit_distance(a, b, limit=2):
+    if abs(len(a) - len(b)) > limit:
+        return limit + 1
+    before, previous = None, list(range(len(b) + 1))
+    for i, ca in enumerate(a, 1):
+        current = [i]
+        for j, cb in enumerate(b, 1):
+            cost = min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + (ca != cb))
+            if i > 1 and j > 1 and ca == b[j - 2] and a[i - 2] == cb:
+                cost = min(cost, before[j - 2] + 1)
+            current.append(cost)
+        if min(current) > limit:
+            return limit + 1
+        before, previous = previous, current
+    return previous[-1]
+
+# Function to get how many typos a query token may contain
+def typo_budget(token):
+    if len(token) < 4:
+        return 0
+    return 1 if len(token) < 8 else 2
+
+# N-gram and token index over the distinct values of one text column
+# Nilai teks yang sama (misalnya template Deskripsi) hanya diindeks sekali
+class TextIndex:
+    def __init__(self, column):
+        codes, uniques = pd.factorize(column)
+        self.codes = codes.astype(np.int32)
+        self.codes.flags.writeable = False
+        self.texts = [str(text).casefold() for text in uniques.tolist()]
+
+        # Posisi baris per nilai teks, terurut naik
+        order = np.argsort(self.codes, kind='stable').astype(np.int32)
+        counts = np.bincount(self.codes[self.codes >= 0], minlength=len(self.texts))
+        self._row_offsets = np.concatenate([[0], np.cumsum(counts)]) + np.count_nonzero(self.codes < 0)
+        self._rows = order
+
+        grams = defaultdict(list)
+        tokens = defaultdict(list)
+        short_texts = []
+        for text_id, text in enumerate(self.texts):
+            if len(text) < NGRAM:
+                short_texts.append(text_id)
+            for gram in _ngrams(text):
+                grams[gram].append(text_id)
+            for token in set(_token_pattern.findall(text)):
+                tokens[token].append(text_id)
+
+        self._grams = {gram: np.array(ids, dtype=np.int32) for gram, ids in grams.items()}
+        self._tokens = {token: np.array(ids, dtype=np.int32) for token, ids in tokens.items()}
+        self._vocabulary = sorted(self._tokens)
+        self._short_texts = np.array(short_texts, dtype=np.int32)
+
+    # Function to get the ids of distinct texts containing query as a substring
+    def substring_ids(self, query):
+        if len(query) >= NGRAM:
+            # Intersect posting list n-gram (terkecil dulu), lalu verifikasi substring aslinya
+            postings = sorted((self._grams.get(gram) for gram in _ngrams(query)), key=lambda p: 0 if p is None else len(p))
+            if postings[0] is None:
+                return np.empty(0, dtype=np.int32)
+            candidates = postings[0]
+            for posting in postings[1:]:
+                candidates = np.intersect1d(candidates, posting, assume_unique=True)
+                if len(candidates) == 0:
+                    break
+        else:
+            # Query pendek: gabungkan posting semua n-gram yang memuat query (sudah pasti cocok)
+            postings = [ids for gram, ids in self._grams.items() if query in gram]
+            short = [i for i in self._short_texts if query in self.texts[i]]
+            return self._union(postings + [np.array(short, dtype=np.int32)])
+
+        return np.array([i for i in candidates if query in self.texts[i]], dtype=np.int32)
+
+    # Function to get the ids of distinct texts with a word starting with prefix
+    def prefix_ids(self, prefix):
+        start = bisect.bisect_left(self._vocabulary, prefix)
+        stop = bisect.bisect_left(self._vocabulary, prefix + "\U0010ffff")
+        return self._union([self._tokens[token] for token in self._vocabulary[start:stop]])
+
+    # Function to get the ids of distinct texts with a word close to token (typo-tolerant)
+    # Kata yang diawali token juga cocok, agar kata yang belum selesai diketik tetap ditemukan
+    def fuzzy_ids(self, token):
+        budget = typo_budget(token)
+        matched = [
+            self._tokens[word] for word in self._vocabulary
+            if word.startswith(token) or (budget and edit_distance(token, word, budget) <= budget)
+        ]
+        return self._union(matched)
+
+    # Function to map distinct-text ids to sorted row positions
+    def rows(self, text_ids):
+        if len(text_ids) == 0:
+            return np.empty(0, dtype=np.int32)
+        if len(text_ids) * 16 > len(self.texts):
+            # Banyak nilai yang cocok: satu gather vektor atas kode lebih murah daripada loop
+            return np.flatnonzero(self.hits(text_ids)[self.codes]).astype(np.int32)
+        return np.sort(np.concatenate([self._rows[self._row_offsets[i]:self._row_offsets[i + 1]] for i in text_ids]))
+
+    # Function to mark matched distinct-text ids (slot terakhir untuk NaN, selalu False)
+    def hits(self, text_ids):
+        hit = np.zeros(len(self.texts) + 1, dtype=bool)
+        hit[text_ids] = True
+        return hit
+
+    # Function to merge posting lists of distinct-text ids into one sorted id array
+    def _union(self, postings):
+        if not postings:
+            return np.empty(0, dtype=np.int32)
+        if len(postings) == 1:
+            return postings[0]
+        hit = np.zeros(len(self.texts), dtype=bool)
+        for ids in postings:
+            hit[ids] = True
+        return np.flatnonzero(hit).astype(np.int32)
+
+# Search index over Nama and Deskripsi; a row matches when either field matches
+# Bisa dipakai sebagai predikat match_filters dengan argument (query, mode)
+class SearchIndex:
+    def __init__(self, data, columns=SEARCH_COLUMNS):
+        self.fields = [TextIndex(data[column]) for column in columns if column in data]
+        self._last = (None, None)
+
+    # Function to get the matching distinct-text ids per field for a query
+    # mode: "substring" (seperti str.contains), "prefix" (awal kata) atau "fuzzy" (toleran typo)
+    def _matches(self, argument):
+        last_argument, last_matches = self._last
+        if argument == last_argument:
+            return last_matches
+
+        query, mode = argument
+        query = query.casefold()
+        matches = []
+        for field in self.fields:
+            if mode == "substring":
+                ids = field.substring_ids(query)
+            else:
+                tokens = _token_pattern.findall(query)
+                lookup = field.prefix_ids if mode == "prefix" else field.fuzzy_ids
+                ids = None
+                for token in tokens:
+                    token_ids = lookup(token)
+                    ids = token_ids if ids is None else np.intersect1d(ids, token_ids, assume_unique=True)
+                if ids is None:
+                    ids = np.empty(0, dtype=np.int32)
+            matches.append(ids)
+
+        self._last = (argument, matches)
+        return matches
+
+    # Function to forget the memoized last query (lookup berikutnya dihitung ulang)
+    def clear(self):
+        self._last = (None, None)
+
+    # Function to count (upper bound) the rows matching a query
+    def count(self, argument):
+        return sum(
+            int((field._row_offsets[ids + 1] - field._row_offsets[ids]).sum())
+            for field, ids in zip(self.fields, self._matches(argument))
+        )
+
+    # Function to get the sorted positions of rows matching a query
+    def lookup(self, argument):
+        rows = [field.rows(ids) for field, ids in zip(self.fields, self._matches(argument))]
+        if not rows:
+            return np.empty(0, dtype=np.int32)
+        if len(rows) == 1:
+            return rows[0]
+        hit = np.zeros(len(self.fields[0].codes), dtype=bool)
+        for positions in rows:
+            hit[positions] = True
+        return np.flatnonzero(hit).astype(np.int32)
+
+    # Function to keep only the candidate positions matching a query
+    def contains(self, positions, argument):
+        keep = np.zeros(len(positions), dtype=bool)
+        for field, ids in zip(self.fields, self._matches(argument)):
+            keep |= field.hits(ids)[field.codes[positions]]
+        return keep
@@ -0,0 +1,113 @@
+import numpy as np
+
+from food_data import default_weights
+from ranking import sort_columns
+from recommender import filter_catalogue, normalize_weights
+from wp_engine import CRITERIA, weight_vector
+
+# Weight-sensitivity analysis of the WP top-K, tanpa menilai ulang di grid bobot
+# Urutan WP ditentukan oleh skor log s_i = sum_j w_j log r_ij (exp dan normalisasi bobot tidak
+# mengubah urutan). Bila satu bobot w_j diubah menjadi t dan bobot lain tetap, skor log setiap
+# hidangan berubah linear: s_i(t) = s_i + (t - w_j) log r_ij. Dua hidangan a (di atas) dan b
+# bertukar tepat di t = w_j - (s_a - s_b) / (log r_aj - log r_bj), sehingga interval stabil dan
+# titik tukar bisa dihitung langsung dari matriks kriteria.
+# Yang dianalisis adalah daftar yang ditampilkan (urutan filter_catalogue, dengan WP_Score yang
+# dibulatkan), sedangkan selisihnya memakai skor log dari matriks yang tidak dibulatkan. Pasangan yang
+# urutannya hanya ditentukan oleh seri pembulatan dianggap seri (bertukar tepat di bobot sekarang).
+# Tepat di sekitar batas interval, selama selisih skornya di bawah pembulatan 0.01, urutan yang
+# ditampilkan mengikuti pemecah seri sort (Rating, posisi).
+# Hidangan dengan kriteria bernilai 0 (log -inf) tidak punya titik tukar yang terdefinisi dan dilewati.
+
+# Sort option yang urutannya dianalisis bila sort yang dipilih tidak diurutkan menurut WP
+WP_SORT = "🎯 Best WP Score"
+
+# Rentang slider bobot; titik tukar di luar rentang ini tidak dilaporkan
+WEIGHT_RANGE = (0.0, 1.0)
+
+DEFAULT_K = 10
+
+# Function to get the weight at which each (above, below) pair swaps when one weight changes
+# NaN bila pasangan tidak pernah bertukar (selisih kriteria 0 atau tidak hingga)
+def flip_points(weight, score_gap, criterion_gap):
+    with np.errstate(divide='ignore', invalid='ignore'):
+        points = weight - score_gap / criterion_gap
+    return np.where(np.isfinite(points) & np.isfinite(criterion_gap) & (criterion_gap != 0), points, np.nan)
+
+# Function to get the log-score lead of each displayed (above, below) pair
+# Lead negatif hanya mungkin bila urutannya ditentukan oleh seri pembulatan WP_Score, jadi dianggap 0
+def _score_gap(scores, above, below):
+    with np.errstate(invalid='ignore'):
+        return np.maximum(scores[above] - scores[below], 0)
+
+# Function to analyse how stable the WP top-k of a filter set is to each weight
+# weights: bobot mentah seperti slider (interval dilaporkan dalam satuan yang sama, bobot lain tetap);
+# sort_by: sort option aplikasi; hanya dipakai bila kunci utamanya WP_Score (Best Match, Best WP Score)
+# filters: argumen filter_catalogue lainnya (category, location, ...)
+# Returns {"sort_by": ..., "top": [...], "criteria": [interval stabil per kriteria], "flips": [titik tukar antar pasangan]}
+def weight_sensitivity(catalogue, weights=None, k=DEFAULT_K, sort_by=WP_SORT, **filters):
+    weights = dict(default_weights if weights is None else weights)
+    w = weight_vector(weights)
+    if (w < 0).any():
+        raise ValueError("Weights must not be negative")
+    if sort_columns(sort_by)[0] != "WP_Score":
+        sort_by = WP_SORT
+
+    # Daftar yang sama dengan rekomendasi biasa: top-k terurut lebih dulu, lalu baris cocok lainnya
+    positions, _ = filter_catalogue(catalogue, sort_by=sort_by, custom_weights=normalize_weights(weights), top_k=k, **filters)
+    matrix = catalogue.wp_matrix[positions]
+    top = np.arange(min(k, len(positions)))
+    rest = np.arange(len(top), len(positions))
+
+    # Skor log dengan kriteria berbobot 0 dilewati, seperti score_wp
+    active = w != 0
+    with np.errstate(invalid='ignore'):
+        scores = matrix[:, active] @ w[active]
+    names = catalogue.data["Nama"].to_numpy(dtype=object)
+
+    def dish(row):
+        return {"id": int(positions[row]), "name": names[positions[row]]}
+
+    result = {"sort_by": sort_by, "top": [dict(dish(row), rank=rank) for rank, row in enumerate(top, 1)],
+              "criteria": [], "flips": []}
+    if len(top) == 0:
+        return result
+
+    # Pasangan yang menjaga top-k: hidangan berurutan di top-k, dan hidangan ke-k melawan semua sisanya
+    above = np.concatenate([top[:-1], np.full(len(rest), top[-1])])
+    below = np.concatenate([top[1:], rest])
+    gap = _score_gap(scores, above, below)
+
+    # Semua pasangan di dalam top-k untuk tabel titik tukar
+    first, second = np.triu_indices(len(top), 1)
+    pair_above, pair_below = top[first], top[second]
+
+    for j, criterion in enumerate(CRITERIA):
+        column = matrix[:, j]
+        points = flip_points(w[j], gap, column[above] - column[below])
+
+        # Selisih kriteria > 0: keunggulan pasangan atas menyusut saat bobot turun (titik tukar di bawah)
+        # Selisih < 0: menyusut saat bobot naik (titik tukar di atas)
+        lower = np.where(points <= w[j], points, np.nan)
+        upper = np.where(points >= w[j], points, np.nan)
+        entry = {"criterion": criterion, "weight": float(w[j]),
+                 "stable_from": WEIGHT_RANGE[0], "stable_to": WEIGHT_RANGE[1], "changes_below": None, "changes_above": None}
+        if not np.isnan(lower).all():
+            bound = int(np.nanargmax(lower))
+            if lower[bound] > WEIGHT_RANGE[0]:
+                entry["stable_from"] = float(lower[bound])
+                entry["changes_below"] = {"above": dish(above[bound]), "below": dish(below[bound])}
+        if not np.isnan(upper).all():
+            bound = int(np.nanargmin(upper))
+            if upper[bound] < WEIGHT_RANGE[1]:
+                entry["stable_to"] = float(upper[bound])
+                entry["changes_above"] = {"above": dish(above[bound]), "below": dish(below[bound])}
+        result["criteria"].append(entry)
+
+        pair_points = flip_points(w[j], _score_gap(scores, pair_above, pair_below), column[pair_above] - column[pair_below])
+        inside = np.flatnonzero((pair_points >= WEIGHT_RANGE[0]) & (pair_points <= WEIGHT_RANGE[1]))
+        for pair in inside[np.argsort(np.abs(pair_points[inside] - w[j]), kind='stable')]:
+            result["flips"].append({
+                "criterion": criterion, "weight": float(pair_points[pair]),
+                "above": dish(pair_above[pair]), "below": dish(pair_below[pair]),
+            })
+    return result
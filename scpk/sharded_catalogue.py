@@ -0,0 +1,199 @@
+import heapq
+import itertools
+import multiprocessing
+import threading
+import zlib
+
+import numpy as np
+import pandas as pd
+
+from cards import PAGE_SIZE, page_bounds, page_count
+from catalogue import Catalogue
+from catalogue_store import read_catalogue, store_is_current
+from food_data import DATA_PATH, STORE_PATH, load_food_data
+from indexes import CATEGORY_COLUMNS
+from ranking import SORT_KEYS
+from recommender import ALL, DEFAULT_SORT, filter_catalogue, options_from_values, page_records, score_method
+from scorers import SCORE_COLUMNS, bounds_from_stats
+from wp_engine import build_criteria_matrix, criteria_stats, merge_criteria_stats
+
+# Cara membagi baris ke shard: per Lokasi (filter lokasi hanya mengenai satu shard) atau hash id baris
+PARTITION_MODES = ("Lokasi", "hash")
+
+# Monotonic version of the sharded catalogue, naik setiap kali shard dimuat ulang
+_versions = itertools.count(1)
+
+# Function to assign every row to a shard: returns an array of shard numbers
+# Memakai crc32 (bukan hash() Python) agar semua proses menghasilkan pembagian yang sama
+def shard_assignment(data, shards, by="Lokasi"):
+    if by == "Lokasi":
+        codes, uniques = pd.factorize(data["Lokasi"])
+        shard_of = np.array([location_shard(value, shards) for value in uniques], dtype=np.int64)
+        return np.where(codes >= 0, shard_of[codes], 0)
+    if by == "hash":
+        return (pd.util.hash_array(np.arange(len(data), dtype=np.int64)) % np.uint64(shards)).astype(np.int64)
+    raise ValueError(f"Unknown partition mode: {by}")
+
+# Function to get the shard that holds every dish of one Lokasi (mode "Lokasi")
+def location_shard(location, shards):
+    return zlib.crc32(str(location).encode("utf-8")) % shards
+
+# Function to load the full source once in a worker: (data, wp_matrix or None)
+# Dari catalogue store kolomnya di-mmap, jadi hanya halaman baris milik shard yang benar-benar dibaca
+def _load_source(csv_path, store_path):
+    if store_is_current(store_path, csv_path):
+        return read_catalogue(store_path)
+    return load_food_data(csv_path), None
+
+# Function to build the merge key of the given rows, comparable across shards
+# Sama dengan urutan ranking.sort_order: NaN di akhir, seri dipecah dengan id global
+def _merge_keys(data, positions, scores, ids, sort_by):
+    columns = []
+    for column, ascending in SORT_KEYS.get(sort_by, SORT_KEYS[DEFAULT_SORT]):
+        if column in SCORE_COLUMNS:
+            values = pd.Series(scores, copy=False)
+        else:
+            values = data[column].iloc[positions]
+        if pd.api.types.is_numeric_dtype(values):
+            key = values.to_numpy(dtype=np.float64, na_value=np.nan)
+            key = np.where(np.isnan(key), np.inf, key if ascending else -key).tolist()
+        else:
+            # Kolom teks hanya diurutkan naik (A-Z); nilai kosong di akhir
+            key = [(True, "") if value is None or value != value else (False, value) for value in values.tolist()]
+        columns.append(key)
+    return list(zip(*columns, ids.tolist()))
+
+# Function to run one shard: load its rows, report local stats, wait for the global stats,
+# then answer queries until told to stop
+def _shard_worker(connection, shard, shards, by, csv_path, store_path):
+    data, wp_matrix = _load_source(csv_path, store_path)
+    ids = np.flatnonzero(shard_assignment(data, shards, by) == shard)
+    part = data.iloc[ids].reset_index(drop=True)
+    del data
+    connection.send(criteria_stats(part))
+
+    # Min/max global dari coordinator: normalisasi WP (dan ideal TOPSIS) sama dengan catalogue tunggal.
+    # Matriks yang sudah dinormalisasi global (dari store) cukup diambil barisnya
+    global_stats = connection.recv()
+    wp_matrix = wp_matrix[ids] if wp_matrix is not None else build_criteria_matrix(part, global_stats)
+    wp_matrix.flags.writeable = False
+    catalogue = Catalogue(part, ("shard", shard, shards, by), wp_matrix, bounds_from_stats(global_stats))
+    connection.send(len(part))
+    catalogue.warm_up()
+
+    while True:
+        command, arguments = connection.recv()
+        if command == "stop":
+            break
+        try:
+            if command == "query":
+                filters, top_k = arguments
+                sort_by = filters.get("sort_by", DEFAULT_SORT)
+                positions, scores = filter_catalogue(catalogue, top_k=top_k, **filters)
+                head, head_scores = positions[:top_k], scores[:top_k]
+                connection.send((
+                    len(positions),
+                    _merge_keys(catalogue.data, head, head_scores, ids[head], sort_by),
+                    page_records(catalogue.data, head, head_scores, score_method(sort_by)[1]),
+                ))
+            elif command == "values":
+                connection.send({column: catalogue.data[column].dropna().unique().tolist() for column in arguments})
+            else:
+                raise ValueError(f"Unknown shard command: {command}")
+        except Exception as error:
+            connection.send(error)
+    connection.close()
+
+# Catalogue partitioned across N local worker processes (scatter-gather)
+# Setiap shard menyimpan sebagian baris beserta index dan cache-nya sendiri, menyaring dan
+# menghitung top-K lokal; coordinator menggabungkan hasil terurut semua shard dengan k-way
+# heap merge. Normalisasi WP memakai min/max global: statistik lokal tiap shard digabung
+# dengan merge_criteria_stats lalu dikirim kembali ke semua shard sebelum melayani query.
+class ShardedCatalogue:
+    def __init__(self, shards=2, by="Lokasi", csv_path=DATA_PATH, store_path=STORE_PATH):
+        if by not in PARTITION_MODES:
+            raise ValueError(f"Unknown partition mode: {by}")
+        self.shards = shards
+        self.by = by
+        self.version = next(_versions)
+
+        # Satu pipe per shard; query dari beberapa thread diserialkan dengan lock
+        self._lock = threading.Lock()
+        self._connections = []
+        self._processes = []
+        for shard in range(shards):
+            connection, child = multiprocessing.Pipe()
+            process = multiprocessing.Process(
+                target=_shard_worker, args=(child, shard, shards, by, csv_path, store_path), daemon=True
+            )
+            process.start()
+            self._connections.append(connection)
+            self._processes.append(process)
+
+        self.stats = merge_criteria_stats([connection.recv() for connection in self._connections])
+        for connection in self._connections:
+            connection.send(self.stats)
+        self.shard_rows = [connection.recv() for connection in self._connections]
+        self.rows = sum(self.shard_rows)
+
+    # Function to send one command to the shards (default: semua) and collect the answers (scatter-gather)
+    def _scatter(self, command, arguments, shards=None):
+        connections = self._connections if shards is None else [self._connections[shard] for shard in shards]
+        with self._lock:
+            for connection in connections:
+                connection.send((command, arguments))
+            answers = [connection.recv() for connection in connections]
+        for answer in answers:
+            if isinstance(answer, Exception):
+                raise answer
+        return answers
+
+    # Function to get the global top-K over all shards: (total matches, records, global ids)
+    # filters sama dengan argumen filter_catalogue (category, sort_by, custom_weights, ...)
+    def top_k(self, k, **filters):
+        # Dengan partisi per Lokasi, filter lokasi cukup dikirim ke satu shard
+        location = filters.get("location", ALL)
+        shards = [location_shard(location, self.shards)] if self.by == "Lokasi" and location != ALL else None
+        answers = self._scatter("query", (filters, k), shards)
+        total = sum(count for count, _, _ in answers)
+
+        # Hasil tiap shard sudah terurut: k-way merge dengan heap, berhenti setelah k baris
+        streams = [zip(keys, records) for _, keys, records in answers]
+        merged = list(itertools.islice(heapq.merge(*streams, key=lambda item: item[0]), k))
+        return total, [record for _, record in merged], [key[-1] for key, _ in merged]
+
+    # Function to get one page of recommendations, in the same shape as recommender.recommend
+    def recommend(self, page=1, page_size=PAGE_SIZE, **filters):
+        total, records, _ = self.top_k(page * page_size, **filters)
+        total_pages = page_count(total, page_size)
+        page = min(max(1, page), total_pages)
+        start, stop = page_bounds(page, total, page_size)
+        return {
+            "version": self.version,
+            "total": total,
+            "catalogue_size": self.rows,
+            "page": page,
+            "pages": total_pages,
+            "page_size": page_size,
+            "score_method": score_method(filters.get("sort_by", DEFAULT_SORT))[0],
+            "results": records[start:stop],
+        }
+
+    # Function to list the valid filter values over all shards (sama dengan recommender.filter_options)
+    def filter_options(self):
+        values = {column: set() for column in CATEGORY_COLUMNS}
+        for answer in self._scatter("values", CATEGORY_COLUMNS):
+            for column in CATEGORY_COLUMNS:
+                values[column].update(answer[column])
+        return options_from_values(values)
+
+    # Function to stop all shard processes
+    def close(self):
+        with self._lock:
+            for connection, process in zip(self._connections, self._processes):
+                try:
+                    connection.send(("stop", None))
+                except (BrokenPipeError, OSError):
+                    pass
+                process.join(timeout=5)
+                connection.close()
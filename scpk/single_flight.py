@@ -0,0 +1,95 @@
+import asyncio
+import threading
+
+# Single-flight: panggilan serentak dengan key yang sama menunggu satu komputasi yang sedang
+# berjalan (leader) dan memakai hasilnya, alih-alih masing-masing menghitung ulang.
+# Hanya komputasi yang sedang berjalan yang dibagi; hasil yang sudah selesai tidak disimpan
+# di sini (itu tugas ResultCache).
+
+# One in-flight computation: the leader sets the result, followers wait for it
+class _Call:
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+        self.waiters = 0
+
+# Coalescing counters shared by the thread and asyncio variants
+class _FlightStats:
+    def __init__(self):
+        self.calls = 0
+        self.executions = 0
+        self.coalesced = 0
+        self.max_waiters = 0
+
+    # Function to report the counters; coalescing_ratio = bagian panggilan yang tidak menghitung sendiri
+    def stats(self):
+        return {
+            "calls": self.calls,
+            "executions": self.executions,
+            "coalesced": self.coalesced,
+            "coalescing_ratio": self.coalesced / self.calls if self.calls else 0.0,
+            "in_flight": len(self._calls),
+            "max_waiters": self.max_waiters,
+        }
+
+# Single-flight group for threads (sesi Streamlit dan worker thread API)
+class SingleFlight(_FlightStats):
+    def __init__(self):
+        super().__init__()
+        self._calls = {}
+        self._lock = threading.Lock()
+
+    # Function to run function() once per key among concurrent callers; returns its result
+    # Exception dari leader juga diteruskan ke semua yang menunggu
+    def do(self, key, function):
+        with self._lock:
+            self.calls += 1
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+                self.executions += 1
+            else:
+                call.waiters += 1
+                self.coalesced += 1
+                self.max_waiters = max(self.max_waiters, call.waiters)
+
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = function()
+            return call.result
+        except BaseException as error:
+            call.error = error
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+
+# Single-flight group for coroutines on one event loop (request API yang identik)
+class AsyncSingleFlight(_FlightStats):
+    def __init__(self):
+        super().__init__()
+        self._calls = {}
+
+    # Function to await coroutine_function() once per key among concurrent callers
+    async def do(self, key, coroutine_function):
+        self.calls += 1
+        call = self._calls.get(key)
+        if call is None:
+            self.executions += 1
+            # [task, waiters]; entri dihapus begitu task selesai
+            call = self._calls[key] = [asyncio.ensure_future(coroutine_function()), 0]
+            call[0].add_done_callback(lambda _: self._calls.pop(key, None))
+        else:
+            call[1] += 1
+            self.coalesced += 1
+            self.max_waiters = max(self.max_waiters, call[1])
+        # shield: pembatalan satu pemanggil tidak membatalkan komputasi milik yang lain
+        return await asyncio.shield(call[0])
@@ -0,0 +1,159 @@
+import argparse
+import os
+import re
+import time
+
+import numpy as np
+import pandas as pd
+
+from catalogue_store import write_catalogue_chunks
+from food_data import DATA_PATH, default_weights, generate_food_dataset
+
+# Baris per blok generator: setiap blok punya RNG sendiri (seed, nomor blok), sehingga hasilnya
+# hanya bergantung pada seed dan jumlah baris, bukan pada ukuran chunk atau urutan pembuatan
+BLOCK_ROWS = 65_536
+
+# Baris per chunk yang ditulis (dibulatkan ke kelipatan BLOCK_ROWS)
+CHUNK_ROWS = 4 * BLOCK_ROWS
+
+# Kolom numerik yang diambil sampelnya dari distribusi empiris per Kategori
+NUMERIC_COLUMNS = ['Harga', 'Rating', 'Waktu_Persiapan', 'Popularitas', 'Ketersediaan']
+
+# Titik kuantil empiris; nilai di luar persentil 1-99 (misalnya Rating 25) tidak ikut ditiru
+QUANTILES = np.linspace(0.01, 0.99, 99)
+
+# Pembulatan nilai hasil sampel: (kelipatan, batas bawah, batas atas)
+ROUNDING = {
+    'Harga': (500, 500, None),
+    'Rating': (0.1, 0.0, 5.0),
+    'Waktu_Persiapan': (1, 1, None),
+    'Popularitas': (1, 0, None),
+    'Ketersediaan': (1, 0, 100),
+}
+
+_trailing_number = re.compile(r"\s*\d+$")
+
+# Function to fit a generator profile to an existing catalogue
+# Per Kategori: frekuensi, nama dasar, deskripsi, sebaran Waktu_Makan dan kuantil tiap kolom numerik.
+# Lokasi diambil dari frekuensi globalnya
+def fit_profile(data):
+    kategori = data['Kategori'].value_counts()
+    lokasi = data['Lokasi'].value_counts()
+    profile = {
+        'kategori': kategori.index.tolist(),
+        'kategori_p': (kategori / kategori.sum()).tolist(),
+        'lokasi': lokasi.index.tolist(),
+        'lokasi_p': (lokasi / lokasi.sum()).tolist(),
+        'groups': [],
+    }
+    for name in profile['kategori']:
+        group = data[data['Kategori'] == name]
+        waktu = group['Waktu_Makan'].value_counts()
+        profile['groups'].append({
+            'stems': sorted(set(_trailing_number.sub("", str(text)) for text in group['Nama'].dropna())),
+            'descriptions': sorted(set(group['Deskripsi'].dropna().astype(str))),
+            'waktu': waktu.index.tolist(),
+            'waktu_p': (waktu / waktu.sum()).tolist(),
+            'quantiles': {c: np.quantile(group[c].dropna().to_numpy(dtype=np.float64), QUANTILES).tolist() for c in NUMERIC_COLUMNS},
+        })
+    return profile
+
+# Function to get the default profile: the cleaned dataset, or the built-in sample when it is missing
+def default_profile(path=DATA_PATH):
+    try:
+        data = pd.read_csv(path)
+    except (OSError, ValueError):
+        data = generate_food_dataset()
+    return fit_profile(data)
+
+# Function to round sampled values like the real data (harga per 500, rating 1 desimal, dst.)
+def _round(column, values):
+    step, low, high = ROUNDING[column]
+    values = np.round(values / step) * step
+    values = np.clip(values, low, high if high is not None else np.inf)
+    if step >= 1:
+        return values.astype(np.int64)
+    return np.round(values, 1)
+
+# Function to generate one block of rows (vectorized, kecuali pemilihan teks per Kategori)
+def generate_block(profile, seed, block, rows):
+    rng = np.random.default_rng([seed, block])
+    start = block * BLOCK_ROWS
+
+    kategori = rng.choice(len(profile['kategori']), size=rows, p=profile['kategori_p'])
+    lokasi = rng.choice(len(profile['lokasi']), size=rows, p=profile['lokasi_p'])
+    numeric = {c: np.empty(rows) for c in NUMERIC_COLUMNS}
+    stem, description, waktu = (np.empty(rows, dtype=object) for _ in range(3))
+
+    # Setiap Kategori diambil sampelnya bersama: nilai acak ditarik per grup dengan urutan tetap
+    for code, group in enumerate(profile['groups']):
+        rows_in_group = np.flatnonzero(kategori == code)
+        size = len(rows_in_group)
+        for c in NUMERIC_COLUMNS:
+            # Inverse CDF dari kuantil empiris (interpolasi linear di antara titik kuantil)
+            numeric[c][rows_in_group] = np.interp(rng.random(size), QUANTILES, group['quantiles'][c])
+        stems = rng.integers(len(group['stems']), size=size)
+        descriptions = rng.integers(len(group['descriptions']), size=size)
+        times = rng.choice(len(group['waktu']), size=size, p=group['waktu_p'])
+        stem[rows_in_group] = np.asarray(group['stems'], dtype=object)[stems]
+        description[rows_in_group] = np.asarray(group['descriptions'], dtype=object)[descriptions]
+        waktu[rows_in_group] = np.asarray(group['waktu'], dtype=object)[times]
+
+    # Nama = nama dasar + nomor baris global, sehingga unik di seluruh catalogue
+    columns = {
+        'Nama': pd.Series(stem) + " " + pd.Series(np.arange(start + 1, start + rows + 1)).astype(str),
+        'Kategori': pd.Categorical.from_codes(kategori, profile['kategori']),
+        'Harga': _round('Harga', numeric['Harga']),
+        'Waktu_Makan': waktu,
+        'Lokasi': pd.Categorical.from_codes(lokasi, profile['lokasi']),
+        'Deskripsi': description,
+    }
+    for c in NUMERIC_COLUMNS[1:]:
+        columns[c] = _round(c, numeric[c])
+    return pd.DataFrame(columns).set_axis(pd.RangeIndex(start, start + rows))
+
+# Function to stream a synthetic catalogue as DataFrame chunks
+# Chunk berisi beberapa blok utuh
+def generate_chunks(rows, seed=42, profile=None, chunk_rows=CHUNK_ROWS):
+    profile = profile or default_profile()
+    blocks_per_chunk = max(1, -(-chunk_rows // BLOCK_ROWS))
+    n_blocks = -(-rows // BLOCK_ROWS)
+    for first in range(0, n_blocks, blocks_per_chunk):
+        blocks = range(first, min(first + blocks_per_chunk, n_blocks))
+        parts = [generate_block(profile, seed, block, min(BLOCK_ROWS, rows - block * BLOCK_ROWS)) for block in blocks]
+        yield parts[0] if len(parts) == 1 else pd.concat(parts)
+
+# Function to write a synthetic catalogue to a CSV (same columns as the cleaned dataset)
+# Ditulis ke file sementara lalu diganti secara atomik
+def write_csv(path, rows, seed=42, profile=None, chunk_rows=CHUNK_ROWS):
+    temp_path = path + ".tmp"
+    with open(temp_path, "w", encoding="utf-8", newline="") as f:
+        for number, chunk in enumerate(generate_chunks(rows, seed, profile, chunk_rows)):
+            chunk.to_csv(f, index=False, header=number == 0)
+    os.replace(temp_path, path)
+
+# Function to write a synthetic catalogue straight to the binary catalogue store
+# WP_Score dihitung dengan bobot default dari statistik global (dua pass atas chunk yang sama)
+def write_store(path, rows, seed=42, profile=None, chunk_rows=CHUNK_ROWS):
+    profile = profile or default_profile()
+    return write_catalogue_chunks(lambda: generate_chunks(rows, seed, profile, chunk_rows), path, default_weights)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Generate a reproducible synthetic MoodRasa catalogue")
+    parser.add_argument("rows", type=int, help="number of dishes (1k - 100M)")
+    parser.add_argument("output", help="output path: a .csv file, or a catalogue store folder")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--format", choices=["csv", "store"], help="default: csv for *.csv, otherwise store")
+    parser.add_argument("--chunk-rows", type=int, default=CHUNK_ROWS, help="rows per written chunk")
+    parser.add_argument("--profile-from", default=DATA_PATH, help="CSV whose distributions are imitated")
+    args = parser.parse_args()
+
+    output_format = args.format or ("csv" if args.output.endswith(".csv") else "store")
+    profile = default_profile(args.profile_from)
+    start = time.perf_counter()
+    if output_format == "csv":
+        write_csv(args.output, args.rows, args.seed, profile, args.chunk_rows)
+    else:
+        write_store(args.output, args.rows, args.seed, profile, args.chunk_rows)
+    elapsed = time.perf_counter() - start
+    print(f"✅ {args.rows} item sintetis (seed {args.seed}) ditulis ke '{args.output}' dalam {elapsed:.1f} detik")
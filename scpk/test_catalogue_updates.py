@@ -0,0 +1,42 @@
+import os
+
+import pandas as pd
+import pytest
+
+from catalogue_updates import CatalogueEditor
+from food_data import DATA_PATH
+from wp_engine import CRITERIA
+
+def _editor():
+    data = pd.read_csv(os.path.join(os.path.dirname(__file__), DATA_PATH), nrows=40)
+    return CatalogueEditor(data[['Nama'] + CRITERIA])
+
+# Function to check that the delta-maintained extrema equal the min/max of the current data
+def _assert_extrema_match(editor):
+    for c in CRITERIA:
+        assert editor.extrema[c].min() == editor.data[c].min()
+        assert editor.extrema[c].max() == editor.data[c].max()
+        assert sum(editor.extrema[c].counts.values()) == editor.data[c].count()
+
+def test_delete_with_duplicate_ids_removes_each_row_once():
+    editor = _editor()
+    top = editor.data['Rating'].idxmax()
+    editor.delete([top, top, 3, 3])
+    assert len(editor.data) == 38
+    _assert_extrema_match(editor)
+
+def test_update_with_duplicate_ids_applies_the_last_value():
+    editor = _editor()
+    editor.update([5, 5], {'Rating': [1.0, 2.0]})
+    assert editor.data.loc[5, 'Rating'] == 2.0
+    _assert_extrema_match(editor)
+
+def test_unknown_ids_raise_value_error_without_changes():
+    editor = _editor()
+    before = editor.data.copy()
+    with pytest.raises(ValueError, match="Unknown dish ids: \\[999\\]"):
+        editor.delete([1, 999])
+    with pytest.raises(ValueError, match="Unknown dish ids: \\[999\\]"):
+        editor.update([1, 999], {'Rating': 3.0})
+    pd.testing.assert_frame_equal(editor.data, before)
+    _assert_extrema_match(editor)
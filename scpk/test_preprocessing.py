@@ -0,0 +1,29 @@
+import os
+
+import numpy as np
+import pandas as pd
+
+from catalogue_store import read_catalogue, write_catalogue_chunks
+from food_data import default_weights
+from preprocessing import RAW_PATH as RAW_FILE, format_report, preprocess
+
+RAW_PATH = os.path.join(os.path.dirname(__file__), RAW_FILE)
+
+def test_format_report_when_every_row_is_dropped(tmp_path):
+    raw = pd.read_csv(RAW_PATH, nrows=5).assign(Harga=np.nan)
+    raw.to_csv(tmp_path / "raw.csv", index=False)
+
+    report = preprocess(str(tmp_path / "raw.csv"), str(tmp_path / "clean.csv"), store_path=str(tmp_path / "store"))
+    assert report['rows_written'] == 0 and report['store'] is None
+    assert "mean=n/a" in format_report(report)
+
+def test_store_from_preprocess_matches_two_pass_export(tmp_path):
+    clean_path, store_path = str(tmp_path / "clean.csv"), str(tmp_path / "store")
+    report = preprocess(RAW_PATH, clean_path, chunksize=97, workers=2, store_path=store_path)
+    write_catalogue_chunks(lambda: pd.read_csv(clean_path, chunksize=97), str(tmp_path / "reference"), default_weights)
+
+    data, wp_matrix = read_catalogue(store_path)
+    expected, expected_matrix = read_catalogue(str(tmp_path / "reference"))
+    assert len(data) == report['rows_written']
+    pd.testing.assert_frame_equal(data, expected)
+    np.testing.assert_array_equal(wp_matrix, expected_matrix)
@@ -0,0 +1,25 @@
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+import recommender
+from catalogue import Catalogue
+from food_data import DATA_PATH, load_food_data
+
+def test_pruning_stats_count_every_query_from_concurrent_threads():
+    catalogue = Catalogue(load_food_data(os.path.join(os.path.dirname(__file__), DATA_PATH)), ("test", "pruning"))
+    positions = np.arange(len(catalogue.data))
+    before = recommender.pruning_snapshot()
+
+    def query(_):
+        return recommender._pruned_top_k(catalogue, positions, recommender.ALL, recommender.ALL,
+                                         recommender.DEFAULT_SORT, None, 10, 0.0)
+
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        tops = list(pool.map(query, range(200)))
+
+    after = recommender.pruning_snapshot()
+    assert after["queries"] - before["queries"] == 200
+    assert after["rows_matched"] - before["rows_matched"] == 200 * len(positions)
+    assert all(np.array_equal(top, tops[0]) for top in tops)
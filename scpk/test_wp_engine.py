@@ -0,0 +1,56 @@
+import numpy as np
+
+from wp_engine import CRITERIA, score_wp, score_wp_batch, top_k_batch
+
+# Profil bobot: acak, satu kriteria saja (bobot lain 0), dan bobot rata
+def _profiles():
+    rng = np.random.default_rng(7)
+    W = rng.random((20, len(CRITERIA)))
+    return np.vstack([W / W.sum(axis=1, keepdims=True), np.eye(len(CRITERIA)), np.full(len(CRITERIA), 0.2)])
+
+# Function to get the reference top-k: full stable sort by score (tertinggi dulu), seri menurut posisi
+def _stable_top_k(matrix, w, k):
+    active = w != 0
+    log_scores = matrix[:, active] @ w[active]
+    key = np.where(np.isnan(log_scores), np.inf, np.minimum(-log_scores, np.finfo(np.float64).max))
+    return np.lexsort((np.arange(len(key)), key))[:k]
+
+# Function to build a matrix of 200 rows with only 8 distinct rows: banyak baris seri tepat di batas top-k
+def _tied_matrix():
+    rng = np.random.default_rng(3)
+    distinct = np.log(rng.uniform(0.2, 1.0, (8, len(CRITERIA))))
+    return distinct[rng.integers(0, len(distinct), 200)]
+
+def test_top_k_batch_breaks_ties_at_the_cutoff_by_position():
+    matrix = _tied_matrix()
+    for k in (1, 5, 10, 37):
+        indices, _ = top_k_batch(matrix, _profiles(), k=k)
+        for w, top in zip(_profiles(), indices):
+            np.testing.assert_array_equal(top, _stable_top_k(matrix, w, k))
+
+def test_top_k_batch_matches_stable_sort_across_chunks():
+    matrix = _tied_matrix()
+    indices, scores = top_k_batch(matrix, _profiles(), k=10, max_chunk_bytes=1)
+    for w, top, top_scores in zip(_profiles(), indices, scores):
+        np.testing.assert_array_equal(top, _stable_top_k(matrix, w, 10))
+        np.testing.assert_array_equal(top_scores, score_wp(matrix, w)[top])
+
+def test_score_wp_batch_equals_score_wp_with_nan_and_zero_criteria():
+    rng = np.random.default_rng(11)
+    matrix = np.log(rng.uniform(0.2, 1.0, (50, len(CRITERIA))))
+    matrix[3, 0] = np.nan
+    matrix[7, 2] = np.nan
+    matrix[9, 4] = -np.inf
+    batch = score_wp_batch(matrix, _profiles())
+    for w, row in zip(_profiles(), batch):
+        np.testing.assert_array_equal(row, score_wp(matrix, w))
+    # NaN hanya menular ke profil yang memakai kriteria itu (profil 21 hanya memakai Harga)
+    assert np.isnan(batch[0, 3]) and not np.isnan(batch[21, 3])
+
+def test_top_k_batch_puts_nan_scores_last():
+    matrix = np.log(np.full((6, len(CRITERIA)), 0.5))
+    matrix[0, 1] = np.nan
+    matrix[1, 3] = -np.inf
+    indices, scores = top_k_batch(matrix, np.full((1, len(CRITERIA)), 0.2), k=6)
+    np.testing.assert_array_equal(indices[0], [2, 3, 4, 5, 1, 0])
+    assert np.isnan(scores[0, -1]) and scores[0, -2] == 0
@@ -0,0 +1,160 @@
+import numpy as np
+
+# Kriteria WP dengan urutan kolom tetap di dalam matriks
+CRITERIA = ['Rating', 'Harga', 'Waktu_Persiapan', 'Popularitas', 'Ketersediaan']
+
+# Benefit (True): higher is better, Cost (False): lower is better
+BENEFIT = np.array([True, False, False, True, True])
+
+# Function to turn a weights dict (or array) into a vector ordered like CRITERIA
+def weight_vector(weights):
+    if isinstance(weights, dict):
+        return np.array([weights[c] for c in CRITERIA], dtype=np.float64)
+    return np.asarray(weights, dtype=np.float64)
+
+# Function to compute the normalization stats of the criteria: {kriteria: {'min', 'max', 'sum', 'count'}}
+# Disimpan bersama catalogue agar normalisasi tidak perlu memindai ulang seluruh data
+def criteria_stats(data):
+    stats = {}
+    for c in CRITERIA:
+        values = data[c].to_numpy(dtype=np.float64)
+        if len(values):
+            stats[c] = {'min': float(values.min()), 'max': float(values.max()), 'sum': float(values.sum()), 'count': len(values)}
+        else:
+            stats[c] = {'min': None, 'max': None, 'sum': 0.0, 'count': 0}
+    return stats
+
+# Function to merge criteria stats of several parts (shard/chunk) into global stats
+def merge_criteria_stats(parts):
+    merged = {}
+    for c in CRITERIA:
+        mins = [part[c]['min'] for part in parts if part[c]['count']]
+        maxs = [part[c]['max'] for part in parts if part[c]['count']]
+        merged[c] = {
+            'min': min(mins) if mins else None,
+            'max': max(maxs) if maxs else None,
+            'sum': float(sum(part[c]['sum'] for part in parts)),
+            'count': sum(part[c]['count'] for part in parts),
+        }
+    return merged
+
+# Function to build the log-normalized criteria matrix (n_dishes x 5)
+# Dibangun sekali per load dataset, lalu dipakai ulang untuk setiap perubahan bobot.
+# stats (dari criteria_stats) boleh diberikan agar normalisasi memakai min/max global
+def build_criteria_matrix(data, stats=None):
+    values = np.column_stack([data[c].to_numpy(dtype=np.float64) for c in CRITERIA])
+    if len(values) == 0:
+        return np.empty((0, len(CRITERIA)), dtype=np.float64)
+    if stats is None:
+        stats = criteria_stats(data)
+
+    # Benefit: x / max, Cost: min / x (sama seperti normalisasi calculate_wp_score)
+    bounds = np.array([stats[c]['max'] if benefit else stats[c]['min'] for c, benefit in zip(CRITERIA, BENEFIT)])
+    normalized = np.empty_like(values)
+    normalized[:, BENEFIT] = values[:, BENEFIT] / bounds[BENEFIT]
+    normalized[:, ~BENEFIT] = bounds[~BENEFIT] / values[:, ~BENEFIT]
+
+    with np.errstate(divide='ignore'):
+        matrix = np.log(normalized)
+    return np.ascontiguousarray(matrix)
+
+# Function to score every dish for one weight vector: exp(log_matrix @ w)
+def score_wp(matrix, weights):
+    w = weight_vector(weights)
+
+    # Kriteria dengan bobot 0 dilewati agar log(0) * 0 tidak menghasilkan NaN (x^0 = 1)
+    active = w != 0
+    if active.all():
+        log_score = matrix @ w
+    else:
+        log_score = matrix[:, active] @ w[active]
+
+    # Scale to 0-100 for better readability
+    return np.round(np.exp(log_score) * 100, 2)
+
+# Function to turn many weight profiles into an (n_users x 5) matrix ordered like CRITERIA
+def weight_matrix(weights):
+    if len(weights) > 0 and isinstance(weights[0], dict):
+        return np.array([[w[c] for c in CRITERIA] for w in weights], dtype=np.float64)
+    return np.atleast_2d(np.asarray(weights, dtype=np.float64))
+
+# Function to normalize each weight profile to sum 1, like the sliders do
+# Profil dengan total bobot 0 diganti dengan bobot default
+def normalize_weight_rows(weights, default_weights):
+    W = weight_matrix(weights)
+    totals = W.sum(axis=1, keepdims=True)
+    normalized = np.divide(W, totals, out=np.zeros_like(W), where=totals > 0)
+    normalized[totals[:, 0] <= 0] = weight_vector(default_weights)
+    return normalized
+
+# Function to compute log WP scores for many weight profiles: (n_users x n_dishes)
+# Hasilnya sama dengan log dari score_wp per profil: kriteria berbobot 0 dilewati
+def _log_scores_batch(matrix, W):
+    # Nilai -inf (kriteria bernilai 0) dan NaN di-nolkan dulu agar dikali bobot 0 tidak menjadi NaN,
+    # lalu baris tersebut dibuat -inf (bobot > 0) atau NaN hanya untuk profil yang memakai kriteria itu
+    dead = np.isneginf(matrix)
+    missing = np.isnan(matrix)
+    if not dead.any() and not missing.any():
+        return W @ matrix.T
+
+    log_scores = W @ np.where(dead | missing, 0.0, matrix).T
+    if dead.any():
+        killed = (W > 0).astype(np.float64) @ dead.T.astype(np.float64) > 0
+        log_scores[killed] = -np.inf
+    if missing.any():
+        unknown = (W != 0).astype(np.float64) @ missing.T.astype(np.float64) > 0
+        log_scores[unknown] = np.nan
+    return log_scores
+
+# Function to score the whole catalogue for many weight profiles in one pass
+def score_wp_batch(matrix, weights):
+    W = weight_matrix(weights)
+    return np.round(np.exp(_log_scores_batch(matrix, W)) * 100, 2)
+
+# Perkiraan byte sementara per (profil, hidangan) di top_k_batch
+CHUNK_CELL_BYTES = 16
+
+# Function to get the top-K dish indices (and WP scores) for every weight profile
+# Profil diproses per chunk agar array sementara (kunci urut, mask) tidak melebihi max_chunk_bytes
+def top_k_batch(matrix, weights, k=10, max_chunk_bytes=256 * 2**20):
+    W = weight_matrix(weights)
+    n_users, n_dishes = len(W), len(matrix)
+    k = min(k, n_dishes)
+
+    indices = np.empty((n_users, k), dtype=np.int64)
+    scores = np.empty((n_users, k), dtype=np.float64)
+    if k == 0:
+        return indices, scores
+
+    chunk = max(1, max_chunk_bytes // (n_dishes * CHUNK_CELL_BYTES))
+    for start in range(0, n_users, chunk):
+        stop = min(start + chunk, n_users)
+        # Kunci urut seperti sort_order (dibangun in-place): skor 0 (log -inf) menjadi float max,
+        # NaN menjadi inf sehingga selalu paling akhir
+        key = -_log_scores_batch(matrix, W[start:stop])
+        np.minimum(key, np.finfo(np.float64).max, out=key)
+        key[np.isnan(key)] = np.inf
+
+        if k < n_dishes:
+            candidates = np.argpartition(key, k - 1, axis=1)[:, :k]
+            # argpartition memilih sembarang di antara baris yang seri dengan nilai ke-k (ambang).
+            # Profil yang punya lebih banyak baris <= ambang dari K dipilih ulang seperti sort_order:
+            # semua baris di bawah ambang, lalu baris yang seri menurut posisi asli sampai K terpenuhi
+            threshold = np.take_along_axis(key, candidates, axis=1).max(axis=1, keepdims=True)
+            for row in np.flatnonzero((key <= threshold).sum(axis=1) > k):
+                below = np.flatnonzero(key[row] < threshold[row])
+                tied = np.flatnonzero(key[row] == threshold[row])[:k - len(below)]
+                candidates[row] = np.concatenate([below, tied])
+        else:
+            candidates = np.broadcast_to(np.arange(n_dishes), key.shape)
+
+        # Urutkan K kandidat: skor tertinggi dulu, seri dipecah berdasarkan posisi asli
+        candidate_keys = np.take_along_axis(key, candidates, axis=1)
+        order = np.lexsort((candidates, candidate_keys), axis=1)
+        top = np.take_along_axis(candidates, order, axis=1)
+
+        indices[start:stop] = top
+        top_keys = np.take_along_axis(key, top, axis=1)
+        scores[start:stop] = np.where(np.isinf(top_keys), np.nan, np.round(np.exp(-top_keys) * 100, 2))
+
+    return indices, scores